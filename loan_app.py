@@ -41,6 +41,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+def prewarm_loan_services():
+    """Load every loan model at startup instead of on the first request per type"""
+    loaded = LoanServiceFactory.prewarm(openai_api_key=OPENAI_API_KEY)
+    print(f"✅ Prewarmed loan services: {', '.join(loaded)}")
+
 # ---------- In-memory session store ----------
 SESSIONS: Dict[str, Dict[str, Any]] = {}
 
@@ -78,10 +84,16 @@ def init_session(loan_type: str) -> str:
         "loan_type": loan_type,
         "conversation": [{"role": "system", "content": service.get_system_prompt()}],
         "user_profile": {},
+        "last_assistant_msg": "",
         "created_at": time.time(),
     }
     return session_id
 
+def append_assistant_message(state: Dict[str, Any], content: str) -> None:
+    """Append an assistant turn and remember it (lowercased) as the session's last question"""
+    state["conversation"].append({"role": "assistant", "content": content})
+    state["last_assistant_msg"] = content.lower()
+
 def _to_float(v):
     """Convert various string formats to float with enhanced error handling"""
     if isinstance(v, (int, float)):
@@ -132,6 +144,15 @@ def clean_user_profile(user_profile: Dict[str, Any]) -> Dict[str, Any]:
             cleaned[k] = v
     return cleaned
 
+def next_missing_field(required_fields: List[str], user_profile: Dict[str, Any], loan_type: str) -> Optional[str]:
+    """Return the first required field still missing, i.e. the one the assistant is asking for"""
+    for f in required_fields:
+        if f not in user_profile or user_profile.get(f) is None:
+            if f == "Academic_Performance" and "Academic_Score" in user_profile and loan_type == "education":
+                continue
+            return f
+    return None
+
 # ---------- Endpoints ----------
 @app.get("/health")
 def health():
@@ -171,7 +192,7 @@ def chat_start(request: StartChatRequest):
         
         conv = SESSIONS[session_id]["conversation"]
         greeting = service.assistant_greeting(conv)
-        conv.append({"role": "assistant", "content": greeting})
+        append_assistant_message(SESSIONS[session_id], greeting)
         
         return StartChatResponse(
             session_id=session_id,
@@ -229,13 +250,20 @@ def chat_message(req: MessageRequest):
         except Exception as e:
             print(f"DEBUG - Storage retrieval failed (non-fatal): {e}")
         
+        # Field the assistant is currently asking for, so services can answer it without an LLM call
+        current_field = next_missing_field(required_fields, user_profile, loan_type)
+
         # Append user message to conversation
         conversation.append({"role": "user", "content": req.message})
         print(f"DEBUG - Added user message to conversation")
 
         # Extract fields from user response with enhanced error handling
         try:
-            extracted = service.extract_info_from_response(req.message, conversation)
+            extracted = service.extract_info_from_response(
+                req.message, conversation,
+                current_field=current_field,
+                last_assistant_msg=state.get("last_assistant_msg")
+            )
             print(f"DEBUG - Extracted fields: {extracted}")
         except Exception as e:
             print(f"DEBUG - Extraction failed: {e}")
@@ -303,7 +331,7 @@ def chat_message(req: MessageRequest):
         # If there are validation errors, return only the first one to avoid overwhelming the user
         if validation_errors:
             error_message = validation_errors[0]
-            conversation.append({"role": "assistant", "content": error_message})
+            append_assistant_message(state, error_message)
             
             # Calculate current missing fields
             current_missing = []
@@ -500,7 +528,7 @@ def chat_message(req: MessageRequest):
                         f"📞 We'll contact you at {customer_info.get('email', '')} or {customer_info.get('phone', '')} within 24 hours."
                     )
                 
-                conversation.append({"role": "assistant", "content": assistant_msg})
+                append_assistant_message(state, assistant_msg)
                 print("DEBUG - Added success message to conversation")
 
                 return MessageResponse(
@@ -547,7 +575,7 @@ def chat_message(req: MessageRequest):
                 if progress_msg:
                     followup = progress_msg + followup
                 
-                conversation.append({"role": "assistant", "content": followup})
+                append_assistant_message(state, followup)
                 print(f"DEBUG - Generated follow-up message: {followup[:100]}...")
 
                 return MessageResponse(
@@ -560,7 +588,7 @@ def chat_message(req: MessageRequest):
                 print(f"DEBUG - Follow-up generation error: {followup_error}")
                 # Fallback message
                 fallback_msg = f"Thank you! I need a few more details to process your {loan_type} loan application. Could you please provide the missing information?"
-                conversation.append({"role": "assistant", "content": fallback_msg})
+                append_assistant_message(state, fallback_msg)
                 
                 return MessageResponse(
                     message=fallback_msg,
@@ -1,13 +1,65 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 import os
+import threading
+import time
+from collections import OrderedDict
 import joblib
-import pandas as pd
 from openai import OpenAI
 
+
+class _TTLCache:
+    """Small thread-safe LRU cache whose entries expire after ttl seconds"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
 class BaseLoanService(ABC):
     """Base class for all loan services"""
     
+    # Subclasses that declare their own __slots__ get no per-instance __dict__;
+    # __weakref__ keeps every service weak-referenceable either way
+    __slots__ = ('model_path', 'models', 'client', '__weakref__')
+    
+    # Loaded model objects keyed by absolute file path, shared by every service instance
+    _MODEL_CACHE: Dict[str, Any] = {}
+    # One lock per file serializes its cache misses, so concurrently constructed services never
+    # load the same file twice while different files still load in parallel.
+    # _MODEL_CACHE_LOCK only guards the _MODEL_LOAD_LOCKS dict itself
+    _MODEL_CACHE_LOCK = threading.Lock()
+    _MODEL_LOAD_LOCKS: Dict[str, threading.Lock] = {}
+    
     def __init__(self, model_path: str, openai_api_key: Optional[str] = None):
         self.model_path = model_path
         self.models = {}
@@ -40,7 +92,7 @@ class BaseLoanService(ABC):
             for key, filename in model_files.items():
                 full_path = os.path.join(self.model_path, filename)
                 if os.path.exists(full_path):
-                    self.models[key] = joblib.load(full_path)
+                    self.models[key] = self._load_once(full_path)
                     print(f"Loaded {key} model from {full_path}")
                 else:
                     print(f"Warning: Model file {full_path} not found")
@@ -48,13 +100,54 @@ class BaseLoanService(ABC):
         except Exception as e:
             print(f"Error loading models: {e}")
     
+    @classmethod
+    def _load_once(cls, path: str) -> Any:
+        """Load a joblib file, reusing the object already loaded from the same path"""
+        key = os.path.abspath(path)
+        model = cls._MODEL_CACHE.get(key)
+        if model is None:
+            with cls._MODEL_CACHE_LOCK:
+                path_lock = cls._MODEL_LOAD_LOCKS.setdefault(key, threading.Lock())
+            with path_lock:
+                model = cls._MODEL_CACHE.get(key)
+                if model is None:
+                    # Memory-map numpy arrays instead of copying them into the heap;
+                    # pages load on first access and are shared between worker processes.
+                    # Only arrays written by joblib.dump(..., compress=False) can be mapped:
+                    # compressed files and plain pickle.dump files load into memory as usual,
+                    # and object-dtype arrays (e.g. LabelEncoder.classes_) are never mapped
+                    model = cls._MODEL_CACHE[key] = joblib.load(key, mmap_mode='r')
+        return model
+    
+    @classmethod
+    def clear_model_cache(cls, directory: Optional[str] = None):
+        """Drop shared model objects so the next load reads the files again.
+        With directory, only files under it are dropped."""
+        with cls._MODEL_CACHE_LOCK:
+            if directory is None:
+                cls._MODEL_CACHE.clear()
+                cls._MODEL_LOAD_LOCKS.clear()
+                return
+            prefix = os.path.join(os.path.abspath(directory), '')
+            for key in [key for key in cls._MODEL_CACHE if key.startswith(prefix)]:
+                del cls._MODEL_CACHE[key]
+                cls._MODEL_LOAD_LOCKS.pop(key, None)
+    
+    @classmethod
+    def clear_prediction_cache(cls):
+        """Drop memoized predictions; services that cache them override this"""
+        pass
+    
     @abstractmethod
     def get_model_files(self) -> Dict[str, str]:
         """Return dictionary of model files needed"""
         pass
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Extract information from user response using OpenAI or fallback logic"""
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
+        """Extract information from user response using OpenAI or fallback logic.
+        current_field is the field the assistant last asked for, and last_assistant_msg the
+        lowercased text of that question, when the caller tracks them."""
         # Try OpenAI with very short timeout first
         if self.client:
             extraction_prompt = self.get_extraction_prompt(user_text, conversation)
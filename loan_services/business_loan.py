@@ -1,4 +1,4 @@
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 import pickle
@@ -220,7 +220,8 @@ Example: {{"Customer_Name": "John Doe", "Business_Age_Years": 5, "Annual_Revenue
         }
         return location_tier_map.get(location_tier, 3)  # Default to Tier-2 City if unknown
 
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with business-specific fallback logic"""
         # Try OpenAI first
         if self.client:
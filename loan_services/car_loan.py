@@ -1,11 +1,53 @@
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 import pickle
 import re
 import json
+import logging
+import orjson
 from .base_loan import BaseLoanService
 
+logger = logging.getLogger(__name__)
+
+# Leading number in an amount string such as '₹5,00,000' or '1.5 lakh'
+_AMOUNT_NUMBER_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+# Multipliers indexed by unit code: 0 = rupees, 1 = lakh, 2 = crore
+_UNIT_MULTIPLIERS = np.array([1.0, 100000.0, 10000000.0])
+
+# Car type keywords, in priority order: explicit body types win over brand/model hints
+_CAR_TOKEN_MAP = {
+    'sedan': 'Sedan', 'suv': 'SUV', 'hatchback': 'Hatchback', 'coupe': 'Coupe',
+    'sedans': 'Sedan', 'suvs': 'SUV', 'hatchbacks': 'Hatchback', 'coupes': 'Coupe',
+    'maruti': 'Hatchback', 'hyundai': 'Sedan', 'tata': 'SUV', 'honda': 'Sedan',
+    'swift': 'Hatchback', 'city': 'Sedan', 'creta': 'SUV', 'nexon': 'SUV'
+}
+_CAR_TOKEN_RANK = {keyword: rank for rank, keyword in enumerate(_CAR_TOKEN_MAP)}
+_WORD_RE = re.compile(r'[a-z]+')
+# Separators stripped from phone numbers before validation
+_PHONE_STRIP = str.maketrans('', '', ' -()+')
+_EMAIL_VALIDATE_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+def _split_amount(amount_str: str) -> Tuple[float, int]:
+    """Split an amount string like '5.5 lakh' into (value, unit_code)"""
+    text = str(amount_str).lower()
+    number_match = _AMOUNT_NUMBER_RE.search(text)
+    if not number_match:
+        return 0.0, 0
+    try:
+        number = float(number_match.group(1).replace(',', ''))
+    except ValueError:
+        return 0.0, 0
+
+    if 'crore' in text:
+        return number, 2
+    elif 'lakh' in text:
+        return number, 1
+    return number, 0
+
+
 class CarLoanService(BaseLoanService):
     """Car Loan Service with ML Model Integration"""
     
@@ -74,8 +116,8 @@ Start by introducing yourself as a car loan specialist."""
         ]
         return np.random.choice(greetings)
     
-    def get_conversation_prompt(self, current_field: str, collected_data: Dict[str, Any], conversation: List[Dict[str, str]]) -> str:
-        """Generate dynamic conversation prompts using OpenAI"""
+    def get_conversation_prompt(self, current_field: str, collected_data: Dict[str, Any], recent: List[Dict[str, str]]) -> str:
+        """Generate dynamic conversation prompts using OpenAI; recent holds the last few messages, sliced by the caller"""
         field_descriptions = {
             "Customer_Name": "full name",
             "Customer_Email": "email address",
@@ -94,10 +136,10 @@ Start by introducing yourself as a car loan specialist."""
 You are a friendly car loan specialist having a natural conversation with a customer.
 
 Collected information so far:
-{json.dumps(collected_data, indent=2)}
+{orjson.dumps(collected_data, option=orjson.OPT_SERIALIZE_NUMPY).decode()}
 
 Current conversation history (last 3 messages):
-{conversation[-3:] if len(conversation) > 3 else conversation}
+{recent}
 
 Next field to collect: {current_field} ({field_descriptions[current_field]})
 
@@ -135,28 +177,29 @@ Generate ONLY the next message to ask for {current_field}. Do not include any ot
             return fallback_messages.get(current_field, f"Could you provide your {current_field.replace('_', ' ').lower()}?")
         
         try:
-            prompt = self.get_conversation_prompt(current_field, collected_data, conversation)
+            prompt = self.get_conversation_prompt(current_field, collected_data, conversation[-3:])
             
             response = self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.8,  # Higher temperature for more varied responses
-                max_tokens=100
+                max_tokens=60,  # A single 1-2 sentence question
+                stop=["\n\n", "User:"]
             )
             
             message = response.choices[0].message.content.strip()
             return message
             
         except Exception as e:
-            print(f"OpenAI conversation generation failed: {e}")
+            logger.warning("OpenAI conversation generation failed: %s", e)
             # Fallback to simple message
             return f"Could you please provide your {current_field.replace('_', ' ').lower()}?"
 
-    def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
+    def get_extraction_prompt(self, user_text: str, recent: List[Dict[str, str]]) -> str:
         return f"""
 Based on the conversation history and the user's latest response, extract any car loan-related information.
 
-Conversation so far: {conversation[-3:] if len(conversation) > 3 else conversation}
+Conversation so far: {recent}
 
 User's latest response: "{user_text}"
 
@@ -186,13 +229,24 @@ Return ONLY a JSON object with the extracted fields. If no information is found,
 Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 800000, "Car_Type": "Sedan", "CIBIL": 750}}
 """.strip()
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with enhanced fallback logic"""
-        print(f"DEBUG - Starting extraction for: '{user_text}'")
+        logger.debug("Starting extraction for: '%s'", user_text)
+        
+        # Fast path: single-field answers ("28", "Sedan", a bare phone number) are
+        # resolved by the pattern extractors without an OpenAI round trip. Only the
+        # asked-for field is trusted; the heuristics' other guesses (e.g. "Honda City"
+        # read as a name) are left to the full extraction
+        if current_field:
+            fast = self._enhanced_fallback_extraction(user_text, conversation)
+            if fast.get(current_field) is not None:
+                logger.debug("Fast-path extracted: %s", fast)
+                return {current_field: fast[current_field]}
         
         # Try OpenAI first if available
         if self.client:
-            extraction_prompt = self.get_extraction_prompt(user_text, conversation)
+            extraction_prompt = self.get_extraction_prompt(user_text, conversation[-3:])
             
             try:
                 resp = self.client.chat.completions.create(
@@ -204,11 +258,11 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
                 m = re.search(r"\{.*\}", extracted_text, re.DOTALL)
                 if m:
                     extracted = json.loads(m.group())
-                    print(f"DEBUG - OpenAI extracted: {extracted}")
+                    logger.debug("OpenAI extracted: %s", extracted)
                     if extracted:  # Only return if we got something useful
                         return extracted
             except Exception as e:
-                print(f"DEBUG - OpenAI extraction failed: {e}")
+                logger.debug("OpenAI extraction failed: %s", e)
         
         # Enhanced fallback extraction
         return self._enhanced_fallback_extraction(user_text, conversation)
@@ -256,7 +310,7 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
         for pattern in phone_patterns:
             match = re.search(pattern, user_text)
             if match:
-                phone = match.group(-1)
+                phone = match.group(match.lastindex)
                 if len(phone) == 10 and phone[0] in '6789':
                     extracted['Customer_Phone'] = phone
                     break
@@ -330,16 +384,10 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
                     break
         
         # Car type extraction
-        car_type_mapping = {
-            'sedan': 'Sedan', 'suv': 'SUV', 'hatchback': 'Hatchback', 'coupe': 'Coupe',
-            'maruti': 'Hatchback', 'hyundai': 'Sedan', 'tata': 'SUV', 'honda': 'Sedan',
-            'swift': 'Hatchback', 'city': 'Sedan', 'creta': 'SUV', 'nexon': 'SUV'
-        }
-        
-        for keyword, car_type in car_type_mapping.items():
-            if keyword in text_lower:
-                extracted['Car_Type'] = car_type
-                break
+        car_keywords = _CAR_TOKEN_MAP.keys() & set(_WORD_RE.findall(text_lower))
+        if car_keywords:
+            keyword = min(car_keywords, key=_CAR_TOKEN_RANK.__getitem__)
+            extracted['Car_Type'] = _CAR_TOKEN_MAP[keyword]
         
         # Down payment percentage
         down_payment_patterns = [
@@ -383,57 +431,55 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
                     extracted['loan_amount'] = amount
                     break
         
-        print(f"DEBUG - Fallback extracted: {extracted}")
+        logger.debug("Fallback extracted: %s", extracted)
         return extracted
     
     def convert_amount_to_number(self, amount_str: str) -> float:
         """Convert lakh/crore amounts to numbers with error handling"""
         if isinstance(amount_str, (int, float)):
             return float(amount_str)
-            
-        amount_str = str(amount_str).lower().strip()
-        
-        # Remove currency symbols and extra spaces
-        amount_str = re.sub(r'[₹rs\.\s]+', '', amount_str)
-        
-        # Extract number and unit
-        number_match = re.search(r'([\d,]+(?:\.[\d,]+)?)', amount_str)
-        if not number_match:
-            return 0.0
-        
-        # Remove commas and convert to float
-        number_str = number_match.group(1).replace(',', '')
-        try:
-            number = float(number_str)
-        except ValueError:
-            return 0.0
-        
-        if 'crore' in amount_str:
-            return number * 10000000  # 1 crore = 1,00,00,000
-        elif 'lakh' in amount_str:
-            return number * 100000    # 1 lakh = 1,00,000
-        else:
-            return number
+
+        number, unit_code = _split_amount(amount_str)
+        return float(number * _UNIT_MULTIPLIERS[unit_code])
+
+    def convert_amounts_to_numbers(self, amount_strs: List[Any]) -> np.ndarray:
+        """Batch version of convert_amount_to_number for bulk reprocessing of chat logs.
+        Parses each string once, then applies the lakh/crore multipliers in a single vectorized pass."""
+        numbers = np.zeros(len(amount_strs))
+        unit_codes = np.zeros(len(amount_strs), dtype=np.intp)
+        for i, amount_str in enumerate(amount_strs):
+            if isinstance(amount_str, (int, float)):
+                numbers[i] = amount_str
+            else:
+                numbers[i], unit_codes[i] = _split_amount(amount_str)
+        return numbers * _UNIT_MULTIPLIERS[unit_codes]
     
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, str]:
         """Validate individual field values with strict eligibility criteria"""
+        return self._validate_cached(field_name, "" if value is None else str(value))
+
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _validate_cached(field_name: str, value: str) -> Tuple[bool, str]:
+        """Memoized body of validate_field, keyed on the field name and stringified value"""
         try:
             if field_name == "Customer_Name":
-                if not value or not str(value).strip():
+                if not value.strip():
                     return False, "Please provide your full name."
-                name = str(value).strip()
+                name = value.strip()
                 if len(name) < 2:
                     return False, "Please provide your complete name."
                 return True, ""
                 
             elif field_name == "Customer_Email":
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, str(value)):
+                if not _EMAIL_VALIDATE_RE.match(value):
                     return False, "Please provide a valid email address."
                 return True, ""
                 
             elif field_name == "Customer_Phone":
-                phone_str = str(value).replace(' ', '').replace('-', '').replace('(', '').replace(')', '').replace('+91', '')
+                phone_str = value.translate(_PHONE_STRIP)
+                if len(phone_str) == 12 and phone_str.startswith('91'):
+                    phone_str = phone_str[2:]
                 if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
                     return False, "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
                 return True, ""
@@ -539,33 +585,30 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
                 'Age': float(user_input['Age'])
             }
             
-            print(f"Car Loan Input data prepared: {input_data}")
+            logger.debug("Car Loan Input data prepared: %s", input_data)
             
             input_df = pd.DataFrame([input_data])
             
-            print(f"Prepared input dataframe shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
+            logger.debug("Prepared input dataframe shape: %s", input_df.shape)
             
             return input_df
             
         except Exception as e:
-            print(f"Error in prepare_model_input: {e}")
+            logger.exception("Error in prepare_model_input")
             raise e
     
     def predict_loan(self, user_input: Dict[str, Any]) -> tuple:
         """Predict car loan amount and interest rate using ML model"""
         try:
-            print(f"Car Loan Prediction - Input: {user_input}")
+            logger.debug("Car Loan Prediction - Input: %s", user_input)
             
             # Prepare input data
             input_df = self.prepare_model_input(user_input)
-            print(f"Prepared input shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
             
             # Try to use actual ML model if available
             if self.models.get("car_loan_model"):
                 try:
-                    print("Using ML model for prediction...")
+                    logger.debug("Using ML model for prediction...")
                     
                     # Load the model bundle
                     bundle = self.models["car_loan_model"]
@@ -575,41 +618,34 @@ Example: {{"Customer_Name": "John Doe", "Age": 30, "applicant_annual_salary": 80
                     label_encoders = bundle["label_encoders"]
                     features = bundle["features"]
                     
-                    print("Model components loaded successfully")
-                    print(f"Expected features: {features}")
+                    logger.debug("Model components loaded, expected features: %s", features)
                     
                     # Prepare data for prediction - ensure correct column order
                     df_input = input_df[features]
-                    print(f"After feature selection: {list(df_input.columns)}")
                     
                     # Scale the features
                     df_scaled = scaler.transform(df_input)
-                    print(f"Data scaled successfully")
                     
                     # Make predictions
                     max_loan_amount = model_max_amt.predict(df_scaled)[0]
                     interest_rate = model_rate.predict(df_scaled)[0]
                     
-                    print(f"Raw predictions - Max Loan: {max_loan_amount}, Interest Rate: {interest_rate}")
+                    logger.debug("Raw predictions - Max Loan: %s, Interest Rate: %s", max_loan_amount, interest_rate)
                     
                     # Ensure reasonable bounds for car loans
                     max_loan_amount = max(max_loan_amount, 100000)    # Min 1 lakh
                     max_loan_amount = min(max_loan_amount, 50000000)  # Max 5 crores
                     interest_rate = max(7.0, min(20.0, interest_rate)) # Between 7% and 20%
                     
-                    print(f"Final ML Prediction - Loan: Rs.{max_loan_amount:,.0f}, Rate: {interest_rate:.2f}%")
+                    logger.debug("Final ML Prediction - Loan: Rs.%.0f, Rate: %.2f%%", max_loan_amount, interest_rate)
                     return round(float(max_loan_amount), 0), round(float(interest_rate), 2)
                     
                 except Exception as e:
-                    print(f"Model prediction error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Model prediction error")
                     raise Exception(f"ML model prediction failed: {str(e)}")
             else:
                 raise Exception("Car loan ML model not available. Cannot process loan prediction.")
             
         except Exception as e:
-            print(f"Prediction error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Prediction error: %s", e)
             raise Exception(f"Car loan prediction failed: {str(e)}")
\ No newline at end of file
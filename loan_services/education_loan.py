@@ -1,12 +1,353 @@
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
 import re
-import json
-from .base_loan import BaseLoanService
+import string
+from bisect import bisect_right
+import orjson
+from .base_loan import BaseLoanService, _TTLCache
+
+# Precompiled patterns for the extraction and validation hot path
+# Name patterns run on the lowercased text; the captured name is title-cased afterwards
+_NAME_RES = [
+    re.compile(r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-z\s]{2,30})"),
+    re.compile(r"^([a-z]{2,}(?:\s+[a-z]{2,})*)\s*$"),
+]
+_ALPHA_WORD_RE = re.compile(r'^[a-z]+$')
+_WORD_RE = re.compile(r'[a-z]+')
+# Words that mark a "name" capture as really being some other answer
+_NAME_BLOCK = frozenset({'years', 'old', 'yrs', 'score', 'percent', 'percentage', 'tier', 'cibil', 'lakh', 'crore'})
+_PHONE_RES = [
+    re.compile(r'(?:\+?91[\s-]?)?([6-9]\d{9})'),
+    re.compile(r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})'),
+]
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '.-')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Digit captures are anchored on non-digit boundaries so long digit runs fail fast
+_AGE_RES = [
+    re.compile(r'\b(?:age|years?\s*old|yrs?)\s*(?:is\s*)?[:=]?\s*(\d{1,2})\b'),
+    re.compile(r'(?:^|[^0-9])(\d{1,2})\s*(?:years?\s*old|yrs?)\b'),
+    re.compile(r'\bi am\s*(\d{1,2})\b'),
+]
+# One pass over the text recording which cue families occur; each numeric pattern block
+# below only runs when its cues (and at least one digit) are present
+_PREFILTER_RE = re.compile(
+    r'(?P<digit>\d)|(?P<age>age|i am)|(?P<years>yr|year)'
+    r'|(?P<academic>score|percent|mark|got|have|my)|(?P<cibil>cibil|credit)'
+)
+_BARE_AGE_RE = re.compile(r'\b(\d{1,2})\b')
+_ACADEMIC_RES = [
+    re.compile(r'(?:academic\s*score|score|percentage|percent|marks?)\s*(?:is\s*)?(?::|=)?\s*(\d+(?:\.\d+)?)\s*(?:%|percent|percentage)?'),
+    re.compile(r'(?:got|scored|have|my)\s*(\d+(?:\.\d+)?)\s*(?:%|percent|percentage|marks?|score)'),
+]
+# Keyword -> (field, canonical value) for course, university tier and loan type
+_KEYWORD_FIELDS = {
+    'engineering': ('Intended_Course', 'STEM'), 'computer science': ('Intended_Course', 'STEM'),
+    'cs': ('Intended_Course', 'STEM'), 'tech': ('Intended_Course', 'STEM'),
+    'btech': ('Intended_Course', 'STEM'), 'b.tech': ('Intended_Course', 'STEM'),
+    'mtech': ('Intended_Course', 'STEM'), 'm.tech': ('Intended_Course', 'STEM'),
+    'mba': ('Intended_Course', 'MBA'), 'management': ('Intended_Course', 'MBA'), 'business': ('Intended_Course', 'MBA'),
+    'medicine': ('Intended_Course', 'Medicine'), 'medical': ('Intended_Course', 'Medicine'),
+    'mbbs': ('Intended_Course', 'Medicine'), 'doctor': ('Intended_Course', 'Medicine'),
+    'finance': ('Intended_Course', 'Finance'), 'banking': ('Intended_Course', 'Finance'), 'accounting': ('Intended_Course', 'Finance'),
+    'law': ('Intended_Course', 'Law'), 'legal': ('Intended_Course', 'Law'), 'llb': ('Intended_Course', 'Law'),
+    'arts': ('Intended_Course', 'Arts'), 'humanities': ('Intended_Course', 'Arts'), 'design': ('Intended_Course', 'Arts'),
+    'other': ('Intended_Course', 'Other'), 'different': ('Intended_Course', 'Other'),
+    'iit': ('University_Tier', 'Tier1'), 'iim': ('University_Tier', 'Tier1'), 'bits': ('University_Tier', 'Tier1'),
+    'nit': ('University_Tier', 'Tier1'), 'top': ('University_Tier', 'Tier1'), 'premier': ('University_Tier', 'Tier1'),
+    'tier1': ('University_Tier', 'Tier1'), 'tier 1': ('University_Tier', 'Tier1'),
+    'good': ('University_Tier', 'Tier2'), 'decent': ('University_Tier', 'Tier2'), 'average': ('University_Tier', 'Tier2'),
+    'tier2': ('University_Tier', 'Tier2'), 'tier 2': ('University_Tier', 'Tier2'),
+    'local': ('University_Tier', 'Tier3'), 'small': ('University_Tier', 'Tier3'), 'private': ('University_Tier', 'Tier3'),
+    'tier3': ('University_Tier', 'Tier3'), 'tier 3': ('University_Tier', 'Tier3'),
+    'secured': ('Loan_Type', 'Secured'), 'collateral': ('Loan_Type', 'Secured'),
+    'unsecured': ('Loan_Type', 'Unsecured'), 'no collateral': ('Loan_Type', 'Unsecured'),
+}
+# One alternation over all keywords, longest first so 'no collateral' wins over 'collateral'.
+# Keywords must start a word ('unsecured' is not 'secured') but may prefix one, so
+# 'technology' still reads as 'tech' and 'lawyer' as 'law'
+_KEYWORD_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(k) for k in sorted(_KEYWORD_FIELDS, key=len, reverse=True)) + r')'
+)
+# Amounts with their context cue, for Coapplicant_Income (co), Guarantor_Networth (gw)
+# and Expected_Loan_Amount (la); the cue may come before or after the amount
+_AMOUNT_CTX_RE = re.compile(
+    r'(?:(?P<co>coapplicant|co-applicant|parent|family)|(?P<gw>guarantor|assets|networth|property)'
+    r'|(?P<la>loan\s*amount|need\b[^\d]{0,20}?\bloan|want\b[^\d]{0,20}?\bloan))'
+    r'[^\d]{0,40}?(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?'
+)
+_AMOUNT_CTX_AFTER_RE = re.compile(
+    r'(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?[^\d]{0,40}?'
+    r'\b(?:(?P<co>parent|family)|(?P<gw>assets|property|worth)|(?P<la>loan\s*amount|need\b[^\d]{0,20}?\bloan))'
+)
+_AMOUNT_CTX_FIELDS = (('co', 'Coapplicant_Income'), ('gw', 'Guarantor_Networth'), ('la', 'Expected_Loan_Amount'))
+_CIBIL_RES = [
+    re.compile(r'(?:cibil|credit[a-z\s]{0,10}score)\s*(?:is\s*)?[:=]?\s*(\d{3})\b'),
+    re.compile(r'(?:^|[^0-9])(\d{3})\s*(?:cibil|credit[a-z\s]{0,10}score)'),
+]
+_TERM_RES = [
+    re.compile(r'(?:term|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*(?:years?|yrs?).*?(?:loan.*?term|duration)'),
+]
+_NUMBER_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+# Separators deleted from phone numbers before validation
+_PHONE_STRIP = str.maketrans('', '', ' -()')
+_EMAIL_VALIDATE_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Model feature order and the positions of the scaled numeric columns within it
+_FEATURES = (
+    "Age", "Academic_Performance", "Intended_Course", "University_Tier",
+    "Coapplicant_Income", "Guarantor_Networth", "CIBIL_Score",
+    "Loan_Type", "Repayment_Capacity", "Loan_Term"
+)
+_NUMERIC_IDX = [0, 4, 5, 6, 8, 9]  # Age, Coapplicant_Income, Guarantor_Networth, CIBIL_Score, Repayment_Capacity, Loan_Term
+
+# Academic score cut-offs and the grade for each band: <60, 60-74, 75-89, 90+
+_PERF_CUTS = (60, 75, 90)
+_PERF_GRADES = ("Poor", "Average", "Good", "Excellent")
+
+# Filler words dropped when reducing a reply to its content tokens, so paraphrases such as
+# "I am 25", "age is 25" and "25 years old" share one cache entry for the same question
+_PARAPHRASE_FILLER = frozenset({
+    'i', 'am', 'im', 'my', 'is', 'its', 'it', 'the', 'a', 'an', 'of', 'me', 'please', 'about',
+    'around', 'approximately', 'approx', 'age', 'old', 'year', 'years', 'yr', 'yrs',
+})
+_CONTENT_TOKEN_RE = re.compile(r"[A-Za-z0-9@._%+-]+")
+
+# Cues in the assistant's question -> the field it is asking for (checked in order)
+_EXPECTED_FIELD_CUES = [
+    (re.compile(r'\b(?:phone|mobile|contact number)\b'), 'Customer_Phone'),
+    (re.compile(r'\be-?mail\b'), 'Customer_Email'),
+    (re.compile(r'\b(?:cibil|credit score)\b'), 'CIBIL_Score'),
+    (re.compile(r'\b(?:academic|marks|score out of)\b'), 'Academic_Score'),
+    (re.compile(r'\b(?:age|how old)\b'), 'Age'),
+    (re.compile(r'\b(?:loan term|tenure|repayment period)\b'), 'Loan_Term'),
+]
+# Field -> (pattern, converter) for answers that are nothing but the requested value
+_QUICK_FIELD_RES = {
+    'Customer_Phone': (re.compile(r'^\s*(?:\+?91[\s-]?)?([6-9]\d{9})\s*$'), str),
+    'Customer_Email': (re.compile(r'^\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\s*$'), str),
+    'CIBIL_Score': (re.compile(r'^\s*(\d{3})\s*$'), int),
+    'Academic_Score': (re.compile(r'^\s*(\d{1,3}(?:\.\d+)?)\s*(?:%|percent|marks)?\s*$'), float),
+    'Age': (re.compile(r'^\s*(\d{1,2})\s*(?:years?(?:\s*old)?|yrs?)?\s*$'), int),
+    'Loan_Term': (re.compile(r'^\s*(\d{1,2})\s*(?:years?|yrs?)?\s*$'), int),
+}
+
+
+def _amount_from_parts(number_str: str, unit: Optional[str]) -> float:
+    """Turn a captured number and optional lakh/crore unit into rupees"""
+    try:
+        number = float(number_str.replace(',', ''))
+    except ValueError:
+        return 0.0
+    if unit and unit.startswith('crore'):
+        return number * 10000000  # 1 crore = 1,00,00,000
+    elif unit and unit.startswith('lakh'):
+        return number * 100000    # 1 lakh = 1,00,000
+    return number
+
+
+def _extract_json_obj(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, skipping braces inside string literals"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _scan_simple(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Find an email address and a 10-digit mobile number in one pass over the text"""
+    email = phone = None
+    n = len(text)
+    i = 0
+    while i < n:
+        ch = text[i]
+        if '0' <= ch <= '9':
+            start = i
+            while i < n and '0' <= text[i] <= '9':
+                i += 1
+            if phone is None:
+                run = text[start:i]
+                if len(run) == 12 and run.startswith('91'):
+                    run = run[2:]
+                if len(run) == 10 and run[0] in '6789':
+                    phone = run
+            continue
+        if ch == '@' and email is None:
+            left = i
+            while left > 0 and text[left - 1] in _EMAIL_LOCAL_CHARS:
+                left -= 1
+            right = i + 1
+            while right < n and text[right] in _EMAIL_DOMAIN_CHARS:
+                right += 1
+            domain = text[i + 1:right].rstrip('.-')
+            host, _, tld = domain.rpartition('.')
+            if left < i and host and len(tld) >= 2 and tld.isascii() and tld.isalpha():
+                email = text[left:i + 1] + domain
+        i += 1
+    return email, phone
+
+
+# Validation failure messages
+_ERR_NAME_EMPTY = "Please provide your full name."
+_ERR_NAME_SHORT = "Please provide your complete name."
+_ERR_EMAIL = "Please provide a valid email address."
+_ERR_PHONE = "Invalid phone number. Phone number must be exactly 10 digits starting with 6, 7, 8, or 9."
+_ERR_AGE = "Invalid age. For education loan applicants, age must be between 18-35."
+_ERR_SCORE_NEGATIVE = "Invalid score. Please enter a real quantity (score cannot be negative)."
+_ERR_SCORE_HIGH = "Invalid score. Please enter a real quantity (score cannot exceed 100)."
+_ERR_CIBIL_LOW = "You are not eligible. CIBIL score must be at least 650 for education loan."
+_ERR_CIBIL_HIGH = "Invalid CIBIL score. CIBIL score cannot exceed 900."
+_ERR_LOAN_AMOUNT = "Invalid loan amount. All values must be positive."
+_ERR_LOAN_AMOUNT_HIGH = "Not eligible. Loan amount cannot exceed ₹3,00,00,000."
+_ERR_TERM = "Invalid loan term. All values must be positive."
+_ERR_TERM_RANGE = "Invalid loan term. Education loan term must be between 1-15 years."
+
+# Per-field validators used by validate_field; each returns (is_valid, error_message)
+def _v_noop(value: Any) -> Tuple[bool, str]:
+    return True, ""
+
+
+def _v_name(value: Any) -> Tuple[bool, str]:
+    if not value or not str(value).strip():
+        return False, _ERR_NAME_EMPTY
+    if len(str(value).strip()) < 2:
+        return False, _ERR_NAME_SHORT
+    return True, ""
+
+
+def _v_email(value: Any) -> Tuple[bool, str]:
+    if not _EMAIL_VALIDATE_RE.match(str(value)):
+        return False, _ERR_EMAIL
+    return True, ""
+
+
+def _v_phone(value: Any) -> Tuple[bool, str]:
+    phone_str = str(value).strip()
+    if phone_str.startswith('+91'):
+        phone_str = phone_str[3:]
+    phone_str = phone_str.translate(_PHONE_STRIP)
+    if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
+        return False, _ERR_PHONE
+    return True, ""
+
+
+def _v_age(value: Any) -> Tuple[bool, str]:
+    age = float(value)
+    if age < 18 or age > 35:
+        return False, _ERR_AGE
+    return True, ""
+
+
+def _v_academic_score(value: Any) -> Tuple[bool, str]:
+    score = float(value)
+    if score < 0:
+        return False, _ERR_SCORE_NEGATIVE
+    elif score > 100:
+        return False, _ERR_SCORE_HIGH
+    return True, ""
+
+
+def _v_cibil(value: Any) -> Tuple[bool, str]:
+    cibil = int(value)
+    if cibil < 650:
+        return False, _ERR_CIBIL_LOW
+    elif cibil > 900:
+        return False, _ERR_CIBIL_HIGH
+    return True, ""
+
+
+def _v_loan_amount(value: Any) -> Tuple[bool, str]:
+    amount = float(value)
+    if amount <= 0:
+        return False, _ERR_LOAN_AMOUNT
+    elif amount > 30000000:  # 3 crores
+        return False, _ERR_LOAN_AMOUNT_HIGH
+    return True, ""
+
+
+def _v_loan_term(value: Any) -> Tuple[bool, str]:
+    term = int(value)
+    if term <= 0:
+        return False, _ERR_TERM
+    elif term < 1 or term > 15:
+        return False, _ERR_TERM_RANGE
+    return True, ""
+
+
+def _positive_amount_validator(field_name: str):
+    """Build a validator requiring a positive amount, naming field_name in the error"""
+    error = f"Invalid {field_name.lower().replace('_', ' ')}. All values must be positive (negative values like -56418 are not possible)."
+    
+    def _validate(value: Any) -> Tuple[bool, str]:
+        if float(value) <= 0:
+            return False, error
+        return True, ""
+    return _validate
+
+
+def _choice_validator(valid: List[str], prompt: str):
+    """Build a validator accepting only the listed values"""
+    error = f"{prompt}: {', '.join(valid)}"
+    
+    def _validate(value: Any) -> Tuple[bool, str]:
+        if value not in valid:
+            return False, error
+        return True, ""
+    return _validate
+
+
+_VALIDATORS = {
+    "Customer_Name": _v_name,
+    "Customer_Email": _v_email,
+    "Customer_Phone": _v_phone,
+    "Age": _v_age,
+    "Academic_Score": _v_academic_score,
+    "CIBIL_Score": _v_cibil,
+    "Expected_Loan_Amount": _v_loan_amount,
+    "Loan_Term": _v_loan_term,
+    "Coapplicant_Income": _positive_amount_validator("Coapplicant_Income"),
+    "Guarantor_Networth": _positive_amount_validator("Guarantor_Networth"),
+    "Intended_Course": _choice_validator(["STEM", "MBA", "Medicine", "Finance", "Law", "Arts", "Other"],
+                                         "Please select your intended course from"),
+    "University_Tier": _choice_validator(["Tier1", "Tier2", "Tier3"], "Please select university tier from"),
+    "Loan_Type": _choice_validator(["Secured", "Unsecured"], "Please select loan type from"),
+}
+
 
 class EducationLoanService(BaseLoanService):
     """Education Loan Service"""
     
+    # OpenAI extractions keyed on (model, last assistant message, user text); the call
+    # runs at temperature 0, so repeated short answers can reuse the earlier result
+    _extraction_cache = _TTLCache(maxsize=1024, ttl=86400)
+    # The expected field's value keyed on (model, expected field, case-preserved content tokens)
+    # to catch rephrased answers
+    _paraphrase_cache = _TTLCache(maxsize=1024, ttl=86400)
+    
+    # {column: {class_label: code}} built from the label encoders on first prediction
+    _encoder_maps: Optional[Dict[str, Dict[str, int]]] = None
+    
     def get_required_fields(self) -> List[str]:
         return [
             "Customer_Name",
@@ -77,12 +418,36 @@ Start by introducing yourself and asking for their name first."""
     def get_fallback_greeting(self) -> str:
         return "Hello! I'm here to help you with your education loan application. To get started, may I have your full name please?"
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with enhanced fallback logic"""
         print(f"DEBUG - Starting extraction for: '{user_text}'")
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
+        
+        # Answers that are just the requested value need no LLM call
+        expected_field = current_field or self._expected_field_from_prompt(last_assistant_msg)
+        quick = self._quick_extract(user_text, expected_field)
+        if quick:
+            print(f"DEBUG - Quick extracted: {quick}")
+            return quick
         
         # Try OpenAI first if available
         if self.client:
+            cache_key = ("gpt-4o-mini", last_assistant_msg[-400:], " ".join(user_text.split()))
+            cached = self._extraction_cache.get(cache_key)
+            paraphrase_key = None
+            if cached is None and expected_field:
+                content_tokens = tuple(
+                    t for t in _CONTENT_TOKEN_RE.findall(user_text) if t.lower() not in _PARAPHRASE_FILLER
+                )
+                if content_tokens:
+                    paraphrase_key = ("gpt-4o-mini", expected_field, content_tokens)
+                    cached = self._paraphrase_cache.get(paraphrase_key)
+            if cached is not None:
+                print(f"DEBUG - Cached extraction: {cached}")
+                return dict(cached)
+            
             extraction_prompt = self.get_extraction_prompt(user_text, conversation)
             
             try:
@@ -92,222 +457,187 @@ Start by introducing yourself and asking for their name first."""
                     temperature=0
                 )
                 extracted_text = resp.choices[0].message.content.strip()
-                m = re.search(r"\{.*\}", extracted_text, re.DOTALL)
-                if m:
-                    extracted = json.loads(m.group())
+                json_text = _extract_json_obj(extracted_text)
+                if json_text:
+                    extracted = orjson.loads(json_text)
                     print(f"DEBUG - OpenAI extracted: {extracted}")
                     if extracted:  # Only return if we got something useful
+                        # If OpenAI missed the field being asked for, let the patterns try for just that
+                        # field; blocks for fields OpenAI already filled are skipped
+                        if expected_field and expected_field not in extracted:
+                            fallback = self._enhanced_fallback_extraction(
+                                user_text, conversation, last_assistant_msg, already=frozenset(extracted)
+                            )
+                            if expected_field in fallback:
+                                extracted[expected_field] = fallback[expected_field]
+                        self._extraction_cache.set(cache_key, dict(extracted))
+                        # Only the expected field depends on the question alone; other keys came from context
+                        if paraphrase_key and expected_field in extracted:
+                            self._paraphrase_cache.set(paraphrase_key, {expected_field: extracted[expected_field]})
                         return extracted
             except Exception as e:
                 print(f"DEBUG - OpenAI extraction failed: {e}")
         
         # Enhanced fallback extraction
-        return self._enhanced_fallback_extraction(user_text, conversation)
+        return self._enhanced_fallback_extraction(user_text, conversation, last_assistant_msg)
+    
+    def _expected_field_from_prompt(self, last_assistant_msg: str) -> Optional[str]:
+        """Guess which field the assistant's last question asked for"""
+        for cue, field in _EXPECTED_FIELD_CUES:
+            if cue.search(last_assistant_msg):
+                return field
+        return None
+    
+    def _quick_extract(self, user_text: str, expected_field: Optional[str]) -> Dict[str, Any]:
+        """Extract only the expected field with its dedicated pattern; empty unless the value validates"""
+        if expected_field not in _QUICK_FIELD_RES:
+            return {}
+        pattern, convert = _QUICK_FIELD_RES[expected_field]
+        match = pattern.search(user_text)
+        if not match:
+            return {}
+        value = convert(match.group(1))
+        is_valid, _ = self.validate_field(expected_field, value)
+        return {expected_field: value} if is_valid else {}
+    
+    def _get_last_assistant_msg(self, conversation: List[Dict[str, str]]) -> str:
+        """Return the most recent assistant message, lowercased"""
+        for msg in reversed(conversation):
+            if msg.get('role') == 'assistant':
+                return msg.get('content', '').lower()
+        return ""
     
-    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
-        """Enhanced fallback extraction with context awareness"""
+    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]],
+                                      last_assistant_msg: Optional[str] = None,
+                                      already: frozenset = frozenset()) -> Dict[str, Any]:
+        """Enhanced fallback extraction with context awareness.
+        Blocks for fields listed in already (e.g. filled by OpenAI) are skipped."""
         extracted = {}
         text_lower = user_text.lower().strip()
         
-        # Get context from last assistant message
-        last_assistant_msg = ""
-        if len(conversation) > 0:
-            for msg in reversed(conversation):
-                if msg.get('role') == 'assistant':
-                    last_assistant_msg = msg.get('content', '').lower()
-                    break
+        # Get context from last assistant message; scan the conversation only if the caller didn't track it
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
         
-        # 1. CUSTOMER NAME
-        name_patterns = [
-            r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})",
-            r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$",
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_text, re.IGNORECASE)
-            if match:
-                name = match.group(1).strip().title()
-                if not any(word in name.lower() for word in ['years', 'old', 'score', 'percent', 'tier']):
-                    extracted['Customer_Name'] = name
-                    break
+        # Email and phone come from one character scan; the regexes below only run on a miss
+        email = phone = None
+        if 'Customer_Email' not in already or 'Customer_Phone' not in already:
+            email, phone = _scan_simple(user_text)
+            if phone and 'Customer_Phone' not in already:
+                extracted['Customer_Phone'] = phone
+            if email and 'Customer_Email' not in already:
+                extracted['Customer_Email'] = email
         
-        # Context-aware name extraction
-        if not extracted.get('Customer_Name') and ('name' in last_assistant_msg or 'call you' in last_assistant_msg):
-            words = user_text.strip().split()
-            if 1 <= len(words) <= 3 and all(re.match(r'^[a-zA-Z]+$', word) for word in words):
-                if not any(word.lower() in ['yes', 'no', 'ok', 'sure', 'hello', 'hi'] for word in words):
-                    extracted['Customer_Name'] = user_text.strip().title()
+        # 1. CUSTOMER NAME
+        if 'Customer_Name' not in already:
+            for pattern in _NAME_RES:
+                match = pattern.search(text_lower)
+                if match:
+                    name = match.group(1).strip()
+                    if not _NAME_BLOCK.intersection(_WORD_RE.findall(name)):
+                        extracted['Customer_Name'] = name.title()
+                        break
+            
+            # Context-aware name extraction
+            if not extracted.get('Customer_Name') and ('name' in last_assistant_msg or 'call you' in last_assistant_msg):
+                words = text_lower.split()
+                if 1 <= len(words) <= 3 and all(_ALPHA_WORD_RE.match(word) for word in words):
+                    if not any(word in ['yes', 'no', 'ok', 'sure', 'hello', 'hi'] for word in words):
+                        extracted['Customer_Name'] = text_lower.title()
         
         # 2. PHONE NUMBER
-        phone_patterns = [
-            r'(?:\+?91[\s-]?)?([6-9]\d{9})',
-            r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})',
-        ]
-        
-        for pattern in phone_patterns:
-            match = re.search(pattern, user_text)
-            if match:
-                phone = match.group(-1)
-                if len(phone) == 10 and phone[0] in '6789':
-                    extracted['Customer_Phone'] = phone
-                    break
-        
-        # Context-aware phone extraction
-        if not extracted.get('Customer_Phone') and any(word in last_assistant_msg for word in ['phone', 'mobile', 'contact', 'number']):
-            phone_digits = re.sub(r'[^\d]', '', user_text)
-            if len(phone_digits) == 10 and phone_digits[0] in '6789':
-                extracted['Customer_Phone'] = phone_digits
+        if 'Customer_Phone' not in already:
+            if not phone:
+                for pattern in _PHONE_RES:
+                    match = pattern.search(text_lower)
+                    if match:
+                        phone = match.group(match.lastindex)
+                        if len(phone) == 10 and phone[0] in '6789':
+                            extracted['Customer_Phone'] = phone
+                            break
+            
+            # Context-aware phone extraction
+            if not extracted.get('Customer_Phone') and any(word in last_assistant_msg for word in ['phone', 'mobile', 'contact', 'number']):
+                phone_digits = _NON_DIGIT_RE.sub('', text_lower)
+                if len(phone_digits) == 10 and phone_digits[0] in '6789':
+                    extracted['Customer_Phone'] = phone_digits
         
         # 3. EMAIL
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_text)
-        if email_match:
-            extracted['Customer_Email'] = email_match.group(0)
-        
-        # 4. AGE
-        age_patterns = [
-            r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})',
-            r'(\d{1,2})\s*(?:years?\s*old|yrs?)',
-            r'i am\s*(\d{1,2})'
-        ]
+        if not email and 'Customer_Email' not in already:
+            email_match = _EMAIL_RE.search(user_text)
+            if email_match:
+                extracted['Customer_Email'] = email_match.group(0)
         
-        for pattern in age_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                age = int(match.group(1))
-                if 18 <= age <= 35:  # Education loan specific age range
-                    extracted['Age'] = age
-                    break
+        cues = {match.lastgroup for match in _PREFILTER_RE.finditer(text_lower)}
+        has_digit = 'digit' in cues
         
-        # Context-aware age extraction
-        if not extracted.get('Age') and 'age' in last_assistant_msg:
-            age_match = re.search(r'\b(\d{1,2})\b', user_text)
-            if age_match:
-                age = int(age_match.group(1))
-                if 18 <= age <= 35:
-                    extracted['Age'] = age
+        # 4. AGE
+        if 'Age' not in already and has_digit:
+            for pattern in (_AGE_RES if cues & {'age', 'years'} else ()):
+                match = pattern.search(text_lower)
+                if match:
+                    age = int(match.group(1))
+                    if 18 <= age <= 35:  # Education loan specific age range
+                        extracted['Age'] = age
+                        break
+            
+            # Context-aware age extraction
+            if not extracted.get('Age') and 'age' in last_assistant_msg:
+                age_match = _BARE_AGE_RE.search(text_lower)
+                if age_match:
+                    age = int(age_match.group(1))
+                    if 18 <= age <= 35:
+                        extracted['Age'] = age
         
         # 5. EDUCATION LOAN SPECIFIC FIELDS
         
         # Academic Score extraction
-        academic_patterns = [
-            r'(?:academic\s*score|score|percentage|percent|marks?)\s*(?:is\s*)?(?::|=)?\s*(\d+(?:\.\d+)?)\s*(?:%|percent|percentage)?',
-            r'(?:got|scored|have|my)\s*(\d+(?:\.\d+)?)\s*(?:%|percent|percentage|marks?|score)',
-        ]
-        
-        for pattern in academic_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                score = float(match.group(1))
-                if score > 100:
-                    score = min(score / 10, 100)  # Handle 850/10 = 85%
-                if 0 <= score <= 100:
-                    extracted["Academic_Score"] = score
-                    break
-        
-        # Intended Course extraction
-        course_mapping = {
-            'engineering': 'STEM', 'computer science': 'STEM', 'cs': 'STEM', 'tech': 'STEM',
-            'mba': 'MBA', 'management': 'MBA', 'business': 'MBA',
-            'medicine': 'Medicine', 'medical': 'Medicine', 'mbbs': 'Medicine', 'doctor': 'Medicine',
-            'finance': 'Finance', 'banking': 'Finance', 'accounting': 'Finance',
-            'law': 'Law', 'legal': 'Law', 'llb': 'Law',
-            'arts': 'Arts', 'humanities': 'Arts', 'design': 'Arts',
-            'other': 'Other', 'different': 'Other'
-        }
-        
-        for keyword, course in course_mapping.items():
-            if keyword in text_lower:
-                extracted["Intended_Course"] = course
-                break
-        
-        # University Tier extraction
-        tier_patterns = {
-            'iit|iim|bits|nit|top|premier|tier1|tier 1': 'Tier1',
-            'good|decent|average|tier2|tier 2': 'Tier2',
-            'local|small|private|tier3|tier 3': 'Tier3'
-        }
-        
-        for pattern, tier in tier_patterns.items():
-            if re.search(pattern, text_lower):
-                extracted["University_Tier"] = tier
-                break
-        
-        # Coapplicant Income extraction
-        income_patterns = [
-            r'(?:coapplicant|co-applicant|parent|family).*?income.*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'income.*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:parent|family)',
-        ]
-        
-        for pattern in income_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Coapplicant_Income'] = amount
-                    break
-        
-        # Guarantor Networth extraction
-        networth_patterns = [
-            r'(?:guarantor|assets|networth|property).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:assets|property|worth)',
-        ]
-        
-        for pattern in networth_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Guarantor_Networth'] = amount
-                    break
+        if 'Academic_Score' not in already and has_digit and 'academic' in cues:
+            for pattern in _ACADEMIC_RES:
+                match = pattern.search(text_lower)
+                if match:
+                    score = float(match.group(1))
+                    if score > 100:
+                        score = min(score / 10, 100)  # Handle 850/10 = 85%
+                    if 0 <= score <= 100:
+                        extracted["Academic_Score"] = score
+                        break
+        
+        # Intended Course, University Tier and Loan Type in a single keyword scan;
+        # the first keyword mentioned for each field wins
+        for keyword_match in _KEYWORD_RE.finditer(text_lower):
+            field, value = _KEYWORD_FIELDS[keyword_match.group(0)]
+            if field not in already:
+                extracted.setdefault(field, value)
+        
+        # Coapplicant Income, Guarantor Networth and Expected Loan Amount in one scan per cue position
+        for pattern in ((_AMOUNT_CTX_RE, _AMOUNT_CTX_AFTER_RE) if has_digit else ()):
+            for match in pattern.finditer(text_lower):
+                field = next(f for group, f in _AMOUNT_CTX_FIELDS if match.group(group))
+                if field not in extracted and field not in already:
+                    amount = _amount_from_parts(match.group('num'), match.group('unit'))
+                    if amount > 0:
+                        extracted[field] = amount
         
         # CIBIL Score extraction
-        cibil_patterns = [
-            r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})',
-            r'(\d{3})\s*(?:cibil|credit.*?score)',
-        ]
-        
-        for pattern in cibil_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                score = int(match.group(1))
-                if 300 <= score <= 900:
-                    extracted['CIBIL_Score'] = score
-                    break
-        
-        # Loan Type extraction
-        if 'secured' in text_lower or 'collateral' in text_lower:
-            extracted['Loan_Type'] = 'Secured'
-        elif 'unsecured' in text_lower or 'no collateral' in text_lower:
-            extracted['Loan_Type'] = 'Unsecured'
+        if 'CIBIL_Score' not in already and has_digit and 'cibil' in cues:
+            for pattern in _CIBIL_RES:
+                match = pattern.search(text_lower)
+                if match:
+                    score = int(match.group(1))
+                    if 300 <= score <= 900:
+                        extracted['CIBIL_Score'] = score
+                        break
         
         # Loan Term extraction
-        term_patterns = [
-            r'(?:term|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?).*?(?:loan.*?term|duration)',
-        ]
-        
-        for pattern in term_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                term = int(match.group(1))
-                if 1 <= term <= 15:
-                    extracted['Loan_Term'] = term
-                    break
-        
-        # Expected Loan Amount extraction
-        loan_amount_patterns = [
-            r'(?:loan.*?amount|need.*?loan|want.*?loan).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:loan.*?amount|need.*?loan)',
-        ]
-        
-        for pattern in loan_amount_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Expected_Loan_Amount'] = amount
-                    break
+        if 'Loan_Term' not in already and has_digit and 'years' in cues:
+            for pattern in _TERM_RES:
+                match = pattern.search(text_lower)
+                if match:
+                    term = int(match.group(1))
+                    if 1 <= term <= 15:
+                        extracted['Loan_Term'] = term
+                        break
         
         print(f"DEBUG - Fallback extracted: {extracted}")
         return extracted
@@ -317,137 +647,33 @@ Start by introducing yourself and asking for their name first."""
         if isinstance(amount_str, (int, float)):
             return float(amount_str)
             
-        amount_str = str(amount_str).lower().strip()
-        
-        # Remove currency symbols and extra spaces
-        amount_str = re.sub(r'[₹rs\.\s]+', '', amount_str)
-        
-        # Extract number and unit
-        number_match = re.search(r'([\d,]+(?:\.[\d,]+)?)', amount_str)
+        amount_str = str(amount_str).lower()
+        number_match = _NUMBER_RE.search(amount_str)
         if not number_match:
             return 0.0
         
-        # Remove commas and convert to float
-        number_str = number_match.group(1).replace(',', '')
-        try:
-            number = float(number_str)
-        except ValueError:
-            return 0.0
-        
-        if 'crore' in amount_str:
-            return number * 10000000  # 1 crore = 1,00,00,000
-        elif 'lakh' in amount_str:
-            return number * 100000    # 1 lakh = 1,00,000
-        else:
-            return number
+        unit = 'crore' if 'crore' in amount_str else 'lakh' if 'lakh' in amount_str else None
+        return _amount_from_parts(number_match.group(1), unit)
     
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, str]:
         """Validate individual field values according to education loan rules"""
         try:
-            if field_name == "Customer_Name":
-                if not value or not str(value).strip():
-                    return False, "Please provide your full name."
-                name = str(value).strip()
-                if len(name) < 2:
-                    return False, "Please provide your complete name."
-                return True, ""
-                
-            elif field_name == "Customer_Email":
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, str(value)):
-                    return False, "Please provide a valid email address."
-                return True, ""
-                
-            elif field_name == "Customer_Phone":
-                phone_str = str(value).replace(' ', '').replace('-', '').replace('(', '').replace(')', '').replace('+91', '')
-                if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
-                    return False, "Invalid phone number. Phone number must be exactly 10 digits starting with 6, 7, 8, or 9."
-                return True, ""
-                
-            elif field_name == "Age":
-                age = float(value)
-                if age < 18 or age > 35:
-                    return False, "Invalid age. For education loan applicants, age must be between 18-35."
-                return True, ""
-                
-            elif field_name == "Academic_Score":
-                score = float(value)
-                if score < 0:
-                    return False, "Invalid score. Please enter a real quantity (score cannot be negative)."
-                elif score > 100:
-                    return False, "Invalid score. Please enter a real quantity (score cannot exceed 100)."
-                return True, ""
-                
-            elif field_name == "CIBIL_Score":
-                cibil = int(value)
-                if cibil < 650:
-                    return False, "You are not eligible. CIBIL score must be at least 650 for education loan."
-                elif cibil > 900:
-                    return False, "Invalid CIBIL score. CIBIL score cannot exceed 900."
-                return True, ""
-                
-            elif field_name == "Expected_Loan_Amount":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "Invalid loan amount. All values must be positive."
-                elif amount > 30000000:  # 3 crores
-                    return False, "Not eligible. Loan amount cannot exceed ₹3,00,00,000."
-                return True, ""
-                
-            elif field_name == "Loan_Term":
-                term = int(value)
-                if term <= 0:
-                    return False, "Invalid loan term. All values must be positive."
-                elif term < 1 or term > 15:
-                    return False, "Invalid loan term. Education loan term must be between 1-15 years."
-                return True, ""
-                
-            elif field_name in ["Coapplicant_Income", "Guarantor_Networth"]:
-                amount = float(value)
-                if amount <= 0:
-                    return False, f"Invalid {field_name.lower().replace('_', ' ')}. All values must be positive (negative values like -56418 are not possible)."
-                return True, ""
-                
-            elif field_name == "Intended_Course":
-                valid_courses = ["STEM", "MBA", "Medicine", "Finance", "Law", "Arts", "Other"]
-                if value not in valid_courses:
-                    return False, f"Please select your intended course from: {', '.join(valid_courses)}"
-                return True, ""
-                
-            elif field_name == "University_Tier":
-                valid_tiers = ["Tier1", "Tier2", "Tier3"]
-                if value not in valid_tiers:
-                    return False, f"Please select university tier from: {', '.join(valid_tiers)}"
-                return True, ""
-                
-            elif field_name == "Loan_Type":
-                valid_types = ["Secured", "Unsecured"]
-                if value not in valid_types:
-                    return False, f"Please select loan type from: {', '.join(valid_types)}"
-                return True, ""
-                
-            return True, ""
-            
+            return _VALIDATORS.get(field_name, _v_noop)(value)
         except (ValueError, TypeError):
             field_display = field_name.replace('_', ' ').lower()
             return False, f"Please provide a valid {field_display} in the correct format."
 
     def convert_academic_score_to_performance(self, score: float) -> str:
         """Convert numeric academic score to performance grade"""
-        if 90 <= score <= 100:
-            return "Excellent"
-        elif 75 <= score < 90:
-            return "Good"
-        elif 60 <= score < 75:
-            return "Average"
-        else:
-            return "Poor"
+        return _PERF_GRADES[bisect_right(_PERF_CUTS, score)]
 
     def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
+        # Only the question being answered carries extraction signal; older turns just add tokens
+        last_question = next((m.get('content', '') for m in reversed(conversation[-2:]) if m.get('role') == 'assistant'), '')
         return f"""
-Based on the conversation history and the user's latest response, extract any education loan-related information.
+Based on the assistant's last question and the user's latest response, extract any education loan-related information.
 
-Conversation so far: {conversation[-3:] if len(conversation) > 3 else conversation}
+Assistant's last question: "{last_question[:300]}"
 
 User's latest response: "{user_text}"
 
@@ -474,6 +700,21 @@ Example: {{"Customer_Name": "John Doe", "Customer_Email": "john@example.com", "A
         """Calculate repayment capacity for education loans"""
         return (income * 4) + (networth * 0.05) + (cibil / 2)
     
+    def load_models(self):
+        """Load models, then build the encoder lookup tables once up front"""
+        super().load_models()
+        if self.models.get("encoders"):
+            self._get_encoder_maps()
+    
+    def _get_encoder_maps(self) -> Dict[str, Dict[str, int]]:
+        """Plain dict lookups equivalent to each LabelEncoder's transform"""
+        if self._encoder_maps is None:
+            self._encoder_maps = {
+                col: {label: code for code, label in enumerate(encoder.classes_)}
+                for col, encoder in self.models["encoders"].items()
+            }
+        return self._encoder_maps
+    
     def predict_loan(self, user_input: Dict[str, Any]) -> tuple:
         """Predict education loan amount and interest rate"""
         if not all([self.models.get("xgb_loan"), self.models.get("xgb_interest"), 
@@ -496,25 +737,20 @@ Example: {{"Customer_Name": "John Doe", "Customer_Email": "john@example.com", "A
         )
         
         # Encode categorical variables
-        encoders = self.models["encoders"]
+        encoder_maps = self._get_encoder_maps()
         for col in ["Academic_Performance", "Intended_Course", "University_Tier", "Loan_Type"]:
-            if col not in encoders:
+            if col not in encoder_maps:
                 raise ValueError(f"Encoder for {col} not found.")
-            processed_input[col] = encoders[col].transform([processed_input[col]])[0]
-        
-        # Prepare features for prediction
-        features = [
-            "Age", "Academic_Performance", "Intended_Course", "University_Tier",
-            "Coapplicant_Income", "Guarantor_Networth", "CIBIL_Score",
-            "Loan_Type", "Repayment_Capacity", "Loan_Term"
-        ]
+            try:
+                processed_input[col] = encoder_maps[col][processed_input[col]]
+            except KeyError:
+                raise ValueError(f"Unknown {col} category: {processed_input[col]!r}")
         
-        X = pd.DataFrame([{k: processed_input[k] for k in features}])
+        # Prepare features for prediction as a single NumPy row in model order
+        X = np.asarray([[processed_input[col] for col in _FEATURES]], dtype=np.float64)
         
         # Scale numeric features
-        numeric_cols = ["Age", "Coapplicant_Income", "Guarantor_Networth", 
-                       "CIBIL_Score", "Repayment_Capacity", "Loan_Term"]
-        X[numeric_cols] = self.models["scaler"].transform(X[numeric_cols])
+        X[:, _NUMERIC_IDX] = self.models["scaler"].transform(X[:, _NUMERIC_IDX])
         
         # Make predictions
         loan_amt = self.models["xgb_loan"].predict(X)[0]
@@ -1,14 +1,301 @@
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple, Union
+from dataclasses import dataclass
 import numpy as np
 import joblib
 import re
-import json
+import orjson
+import logging
 from .base_loan import BaseLoanService
 
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for the extraction and validation hot path
+_NAME_PATTERNS = [
+    re.compile(r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-z\s]{2,30})"),
+    re.compile(r"^([a-z][a-z]+(?:\s+[a-z][a-z]+)*)\s*$"),
+]
+_ALPHA_WORD_RE = re.compile(r'^[a-zA-Z]+$')
+# Fragments that mark a "name" capture as really being some other answer; matched
+# anywhere in the capture, so 'old' also rejects 'gold' and 'work' rejects 'working'
+_NAME_STOPWORD_RE = re.compile(r'years|old|work|job|score')
+_MOBILE_FIRST = frozenset('6789')
+_PHONE_PATTERNS = [
+    re.compile(r'(?:\+?91[\s-]?)?([6-9]\d{9})'),
+    re.compile(r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})'),
+]
+# Cues in the last assistant message, each checked with one scan instead of a substring test per word
+_NAME_CUE_RE = re.compile(r'name|call you')
+_PHONE_CUE_RE = re.compile(r'phone|mobile|contact|number')
+# Short replies that are not names
+_YESNO_RE = re.compile(r'\b(?:yes|no|ok|sure|hello|hi)\b')
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+# One email pattern shared by extraction (word-bounded search) and validation (fullmatch)
+_EMAIL_CORE = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
+_EMAIL_RE = re.compile(rf'\b{_EMAIL_CORE}\b')
+_AGE_PATTERNS = [
+    re.compile(r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})'),
+    re.compile(r'(\d{1,2})\s*(?:years?\s*old|yrs?)'),
+    re.compile(r'i am\s*(\d{1,2})'),
+]
+_BARE_AGE_RE = re.compile(r'\b(\d{1,2})\b')
+_INCOME_PATTERNS = [
+    re.compile(r'(?:annual.*?income|salary|earn).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)'),
+    re.compile(r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:annual.*?income|salary|yearly)'),
+]
+_CIBIL_PATTERNS = [
+    re.compile(r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})'),
+    re.compile(r'(\d{3})\s*(?:cibil|credit.*?score)'),
+]
+_GOLD_VALUE_PATTERNS = [
+    re.compile(r'(?:gold.*?value|gold.*?worth|jewelry.*?value).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)'),
+    re.compile(r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:gold.*?value|gold.*?worth)'),
+]
+_LOAN_AMOUNT_PATTERNS = [
+    re.compile(r'(?:loan.*?amount|need.*?loan|want.*?loan).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)'),
+    re.compile(r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:loan.*?amount|need.*?loan)'),
+]
+_TENURE_PATTERNS = [
+    re.compile(r'(?:tenure|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*(?:years?|yrs?).*?(?:tenure|duration)'),
+]
+# Occupation keywords in priority order; the earliest entry found in the text wins
+_OCCUPATION_KEYWORDS = {
+    'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried', 'working': 'Salaried',
+    'retired': 'Retired', 'pension': 'Retired', 'senior': 'Retired',
+    'business': 'Business', 'businessman': 'Business', 'trader': 'Business', 'merchant': 'Business',
+    'self employed': 'Self-employed', 'self-employed': 'Self-employed', 'freelance': 'Self-employed', 'consultant': 'Self-employed'
+}
+_OCCUPATION_RANK = {keyword: rank for rank, keyword in enumerate(_OCCUPATION_KEYWORDS)}
+# Zero-width lookahead so one scan reports every keyword, including overlapping ones
+_OCCUPATION_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(_OCCUPATION_KEYWORDS, key=len, reverse=True)) + '))'
+)
+# Number and optional lakh/crore unit captured in one pass, e.g. '₹2,50,000' or '1.5 lakhs'
+_AMOUNT_FULL = re.compile(r'(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakh|crore)?')
+# Fields the pattern extractors read reliably enough to skip the OpenAI call
+_CONFIDENT_FIELDS = ("Customer_Phone", "Customer_Email", "Age", "CIBIL_Score", "Loan_Tenure")
+# Whole-string validators, used with fullmatch
+_EMAIL_VALIDATE_RE = re.compile(_EMAIL_CORE)
+_PHONE_VALIDATE_RE = re.compile(r'[6-9][0-9]{9}')
+# Separators deleted from phone numbers before validation
+_PHONE_CLEAN = str.maketrans('', '', ' -()+')
+
+_OCCUPATION_CHOICES = ("Salaried", "Retired", "Business", "Self-employed")
+_VALID_OCCUPATIONS = frozenset(_OCCUPATION_CHOICES)
+
+# Validation failure messages
+_ERR_NAME_EMPTY = "Please provide your full name."
+_ERR_NAME_SHORT = "Please provide your complete name."
+_ERR_EMAIL = "Please provide a valid email address."
+_ERR_PHONE = "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
+_ERR_AGE_LOW = "INELIGIBLE: You must be at least 21 years old to apply for a gold loan. Unfortunately, we cannot process your application at this time."
+_ERR_AGE_HIGH = "INELIGIBLE: Gold loans are available only for applicants up to 75 years of age. Unfortunately, we cannot process your application at this time."
+_ERR_CIBIL_LOW = "INELIGIBLE: A minimum CIBIL score of 600 is required for gold loan approval. Your current score does not meet our eligibility criteria."
+_ERR_CIBIL_RANGE = "Please provide a valid CIBIL score between 300 and 900. Could you check and confirm your credit score?"
+_ERR_OCCUPATION = f"Please select your occupation from: {', '.join(_OCCUPATION_CHOICES)}. Which category best describes your occupation?"
+_ERR_INCOME = "Annual income must be a positive amount. Please provide your yearly income."
+_ERR_INCOME_LOW = "INELIGIBLE: Minimum annual income of ₹1,80,000 is required for gold loan eligibility."
+_ERR_INCOME_HIGH = "Please verify your annual income. The amount seems unusually high. Could you confirm?"
+_ERR_GOLD = "Gold value must be a positive amount. Please provide the current market value of your gold in INR."
+_ERR_GOLD_LOW = "INELIGIBLE: Minimum gold value of ₹10,000 is required for gold loan eligibility."
+_ERR_GOLD_HIGH = "Please verify your gold value. The amount seems unusually high. Could you confirm the current market value?"
+_ERR_LOAN_AMOUNT = "Loan amount must be a positive amount. Please provide your desired loan amount in INR."
+_ERR_LOAN_AMOUNT_LOW = "INELIGIBLE: Minimum loan amount of ₹5,000 is required."
+_ERR_LOAN_AMOUNT_HIGH = "Please verify your loan amount. The amount seems unusually high for a gold loan."
+_ERR_TENURE_LOW = "INELIGIBLE: Gold loan tenure must be at least 1 year. Please specify a tenure between 1 and 3 years."
+_ERR_TENURE_HIGH = "INELIGIBLE: Gold loan tenure cannot exceed 3 years. Please specify a tenure between 1 and 3 years."
+
+# Per-field validators used by validate_field; each returns (is_valid, error_message)
+def _v_noop(value: Any) -> Tuple[bool, str]:
+    return True, ""
+
+
+def _v_name(value: Any) -> Tuple[bool, str]:
+    if not value or not str(value).strip():
+        return False, _ERR_NAME_EMPTY
+    if len(str(value).strip()) < 2:
+        return False, _ERR_NAME_SHORT
+    return True, ""
+
+
+def _v_email(value: Any) -> Tuple[bool, str]:
+    if not _EMAIL_VALIDATE_RE.fullmatch(str(value)):
+        return False, _ERR_EMAIL
+    return True, ""
+
+
+def _v_phone(value: Any) -> Tuple[bool, str]:
+    phone_str = str(value).translate(_PHONE_CLEAN)
+    if len(phone_str) == 12 and phone_str.startswith('91'):
+        phone_str = phone_str[2:]
+    if not _PHONE_VALIDATE_RE.fullmatch(phone_str):
+        return False, _ERR_PHONE
+    return True, ""
+
+
+def _v_age(value: Any) -> Tuple[bool, str]:
+    age = float(value)
+    if age < 21:
+        return False, _ERR_AGE_LOW
+    elif age > 75:
+        return False, _ERR_AGE_HIGH
+    return True, ""
+
+
+def _v_cibil(value: Any) -> Tuple[bool, str]:
+    cibil = float(value)
+    if cibil < 600:
+        return False, _ERR_CIBIL_LOW
+    elif not (300 <= cibil <= 900):
+        return False, _ERR_CIBIL_RANGE
+    return True, ""
+
+
+def _v_occupation(value: Any) -> Tuple[bool, str]:
+    if not isinstance(value, str) or value not in _VALID_OCCUPATIONS:
+        return False, _ERR_OCCUPATION
+    return True, ""
+
+
+def _v_income(value: Any) -> Tuple[bool, str]:
+    income = float(value)
+    if income <= 0:
+        return False, _ERR_INCOME
+    elif income < 180000:  # Minimum 1.8 lakhs per year
+        return False, _ERR_INCOME_LOW
+    elif income > 60000000:  # Maximum 6 crores per year
+        return False, _ERR_INCOME_HIGH
+    return True, ""
+
+
+def _v_gold_value(value: Any) -> Tuple[bool, str]:
+    value_amount = float(value)
+    if value_amount <= 0:
+        return False, _ERR_GOLD
+    elif value_amount < 10000:  # Minimum 10k gold value
+        return False, _ERR_GOLD_LOW
+    elif value_amount > 50000000:  # Maximum 5 crores
+        return False, _ERR_GOLD_HIGH
+    return True, ""
+
+
+def _v_loan_amount(value: Any) -> Tuple[bool, str]:
+    amount = float(value)
+    if amount <= 0:
+        return False, _ERR_LOAN_AMOUNT
+    elif amount < 5000:  # Minimum 5k loan
+        return False, _ERR_LOAN_AMOUNT_LOW
+    elif amount > 10000000:  # Maximum 1 crore
+        return False, _ERR_LOAN_AMOUNT_HIGH
+    return True, ""
+
+
+def _v_tenure(value: Any) -> Tuple[bool, str]:
+    tenure = float(value)
+    if tenure < 1:
+        return False, _ERR_TENURE_LOW
+    elif tenure > 3:
+        return False, _ERR_TENURE_HIGH
+    return True, ""
+
+
+_VALIDATORS = {
+    "Customer_Name": _v_name,
+    "Customer_Email": _v_email,
+    "Customer_Phone": _v_phone,
+    "Age": _v_age,
+    "CIBIL_Score": _v_cibil,
+    "Occupation": _v_occupation,
+    "Annual_Income": _v_income,
+    "Gold_Value": _v_gold_value,
+    "Loan_Amount": _v_loan_amount,
+    "Loan_Tenure": _v_tenure,
+}
+
+
+@dataclass(slots=True)
+class GoldLoanRecord:
+    """Model inputs for one applicant, cast once from the collected profile"""
+    age: float
+    annual_income: float
+    cibil: float
+    gold_value: float
+    loan_tenure: float
+    occupation: str
+    
+    @classmethod
+    def from_input(cls, user_input: Dict[str, Any]) -> "GoldLoanRecord":
+        return cls(
+            age=float(user_input['Age']),
+            annual_income=float(user_input['Annual_Income']),
+            cibil=float(user_input['CIBIL_Score']),
+            gold_value=float(user_input['Gold_Value']),
+            loan_tenure=float(user_input['Loan_Tenure']),
+            occupation=user_input['Occupation'],
+        )
+
+
+GoldLoanInput = Union[Dict[str, Any], GoldLoanRecord]
+
+
+def _bound_predictions(predictions: np.ndarray, gold_values: np.ndarray) -> np.ndarray:
+    """Apply gold loan bounds to raw (N, 2) [Loan_Amount, Rate_of_Interest] predictions.
+    Works in place on one float64 copy, so no per-step temporaries are allocated."""
+    bounded = np.array(predictions, dtype=np.float64)
+    loan_amounts = bounded[:, 0]
+    interest_rates = bounded[:, 1]
+    # Gold loans typically offer 70-80% of gold value
+    np.minimum(loan_amounts, gold_values * 0.8, out=loan_amounts)
+    np.maximum(loan_amounts, 5000.0, out=loan_amounts)  # Min 5k
+    np.clip(interest_rates, 8.0, 24.0, out=interest_rates)  # Between 8% and 24%
+    return bounded
+
+
+# Static extraction instructions, sent first and byte-identical on every call
+# so OpenAI's automatic prompt prefix caching can reuse them across turns
+_EXTRACTION_SCHEMA_PREFIX = """
+Based on the conversation history and the user's latest response, extract any gold loan-related information.
+
+Extract information for these fields (only if clearly mentioned):
+
+Customer Information:
+- Customer_Name: full name as string
+- Customer_Email: email address as string  
+- Customer_Phone: 10-digit phone number as string (remove +91, spaces, dashes)
+
+Loan Information:
+- Age: number (21-75)
+- Annual_Income: number in INR (yearly income, must be positive)
+- CIBIL_Score: number (300-900, minimum 600 for gold loans)
+- Occupation: exactly one of ["Salaried", "Retired", "Business", "Self-employed"]
+- Gold_Value: number (current market value of gold in INR)
+- Loan_Amount: number (desired loan amount in INR)
+- Loan_Tenure: number (years, typically 1-3 for gold loans)
+
+Important:
+- For Occupation, map variations like "salaried employee", "business owner", "retired person" to exact options
+- Convert lakhs/crores to actual numbers (e.g., "5 lakhs income" = 500000)
+- Extract only information that is clearly stated
+- Do NOT extract Gold_Weight, Gold_Purity, or Gold_Rate_Per_Gram - only Gold_Value
+
+Return ONLY a JSON object with the extracted fields. If no information is found, return empty JSON {}.
+Example: {"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occupation": "Salaried", "Gold_Value": 400000, "Loan_Amount": 300000, "Loan_Tenure": 2}
+""".strip()
+
+
 class GoldLoanService(BaseLoanService):
     """Gold Loan Service with ML Model Integration"""
     
+    # Components of the gold model package, unpacked once by load_models
+    _model = None
+    _scaler = None
+    _encoder = None
+    _features: Optional[List[str]] = None
+    _targets: Optional[List[str]] = None
+    # Underlying XGBoost booster and the tree range the sklearn wrapper would predict with
+    _booster = None
+    _iteration_range: Tuple[int, int] = (0, 0)
+    
     def get_required_fields(self) -> List[str]:
         return [
             # Customer Contact Information
@@ -66,135 +353,120 @@ Start by introducing yourself as a gold loan specialist."""
         return "Hello! I'm a gold loan specialist here to help you with your gold loan application. Gold loans offer quick financing against your gold jewelry. Let's start with your full name - what should I call you?"
     
     def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
+        """Volatile part of the extraction prompt; the static instructions live in _EXTRACTION_SCHEMA_PREFIX"""
+        # Compact JSON of the last three turns rather than the Python repr of the message dicts
+        recent = orjson.dumps(conversation[-3:]).decode()
         return f"""
-Based on the conversation history and the user's latest response, extract any gold loan-related information.
-
-Conversation so far: {conversation[-3:] if len(conversation) > 3 else conversation}
+Conversation so far: {recent}
 
 User's latest response: "{user_text}"
-
-Extract information for these fields (only if clearly mentioned):
-
-Customer Information:
-- Customer_Name: full name as string
-- Customer_Email: email address as string  
-- Customer_Phone: 10-digit phone number as string (remove +91, spaces, dashes)
-
-Loan Information:
-- Age: number (21-75)
-- Annual_Income: number in INR (yearly income, must be positive)
-- CIBIL_Score: number (300-900, minimum 600 for gold loans)
-- Occupation: exactly one of ["Salaried", "Retired", "Business", "Self-employed"]
-- Gold_Value: number (current market value of gold in INR)
-- Loan_Amount: number (desired loan amount in INR)
-- Loan_Tenure: number (years, typically 1-3 for gold loans)
-
-Important:
-- For Occupation, map variations like "salaried employee", "business owner", "retired person" to exact options
-- Convert lakhs/crores to actual numbers (e.g., "5 lakhs income" = 500000)
-- Extract only information that is clearly stated
-- Do NOT extract Gold_Weight, Gold_Purity, or Gold_Rate_Per_Gram - only Gold_Value
-
-Return ONLY a JSON object with the extracted fields. If no information is found, return empty JSON {{}}.
-Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occupation": "Salaried", "Gold_Value": 400000, "Loan_Amount": 300000, "Loan_Tenure": 2}}
 """.strip()
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with enhanced fallback logic"""
-        print(f"DEBUG - Starting extraction for: '{user_text}'")
+        logger.debug("Starting extraction for: '%s'", user_text)
         
-        # Try OpenAI first if available
+        # Cheap pattern pass first: a valid phone, email, age, CIBIL score or tenure that
+        # answers the question being asked needs no OpenAI round trip
+        quick = self._enhanced_fallback_extraction(user_text, conversation, last_assistant_msg)
+        if self._is_confident(quick, current_field):
+            logger.debug("Prefilter extracted: %s", quick)
+            return quick
+        
+        # Try OpenAI if available
         if self.client:
             extraction_prompt = self.get_extraction_prompt(user_text, conversation)
             
             try:
                 resp = self.client.chat.completions.create(
                     model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": extraction_prompt}],
-                    temperature=0
+                    messages=[
+                        {"role": "system", "content": _EXTRACTION_SCHEMA_PREFIX},
+                        {"role": "user", "content": extraction_prompt},
+                    ],
+                    temperature=0,
+                    response_format={"type": "json_object"}
                 )
-                extracted_text = resp.choices[0].message.content.strip()
-                m = re.search(r"\{.*\}", extracted_text, re.DOTALL)
-                if m:
-                    extracted = json.loads(m.group())
-                    print(f"DEBUG - OpenAI extracted: {extracted}")
-                    if extracted:  # Only return if we got something useful
-                        return extracted
+                # JSON mode guarantees a single object, so no need to scan for braces
+                extracted = orjson.loads(resp.choices[0].message.content)
+                logger.debug("OpenAI extracted: %s", extracted)
+                if extracted:  # Only return if we got something useful
+                    return extracted
             except Exception as e:
-                print(f"DEBUG - OpenAI extraction failed: {e}")
+                logger.debug("OpenAI extraction failed: %s", e)
         
         # Enhanced fallback extraction
-        return self._enhanced_fallback_extraction(user_text, conversation)
+        return quick
+    
+    def _is_confident(self, extracted: Dict[str, Any], current_field: Optional[str]) -> bool:
+        """True when extracted covers the asked-for field and holds at least one valid high-confidence field"""
+        if current_field and current_field not in extracted:
+            return False
+        # The bare-word name pattern also fires on replies like "salaried"; an unrequested name is ambiguous
+        if 'Customer_Name' in extracted and current_field != 'Customer_Name':
+            return False
+        return any(
+            field in extracted and self.validate_field(field, extracted[field])[0]
+            for field in _CONFIDENT_FIELDS
+        )
+    
+    def _get_last_assistant_msg(self, conversation: List[Dict[str, str]]) -> str:
+        """Return the most recent assistant message, lowercased"""
+        for msg in reversed(conversation):
+            if msg.get('role') == 'assistant':
+                return msg.get('content', '').lower()
+        return ""
     
-    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]],
+                                      last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Enhanced fallback extraction with context awareness"""
         extracted = {}
         text_lower = user_text.lower().strip()
         
-        # Get context from last assistant message
-        last_assistant_msg = ""
-        if len(conversation) > 0:
-            for msg in reversed(conversation):
-                if msg.get('role') == 'assistant':
-                    last_assistant_msg = msg.get('content', '').lower()
-                    break
+        # Get context from last assistant message; scan the conversation only if the caller didn't track it
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
         
         # 1. CUSTOMER NAME
-        name_patterns = [
-            r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})",
-            r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$",
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_text, re.IGNORECASE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 name = match.group(1).strip().title()
-                if not any(word in name.lower() for word in ['years', 'old', 'work', 'job', 'score']):
+                if not _NAME_STOPWORD_RE.search(name.lower()):
                     extracted['Customer_Name'] = name
                     break
         
         # Context-aware name extraction
-        if not extracted.get('Customer_Name') and ('name' in last_assistant_msg or 'call you' in last_assistant_msg):
+        if not extracted.get('Customer_Name') and _NAME_CUE_RE.search(last_assistant_msg):
             words = user_text.strip().split()
-            if 1 <= len(words) <= 3 and all(re.match(r'^[a-zA-Z]+$', word) for word in words):
-                if not any(word.lower() in ['yes', 'no', 'ok', 'sure', 'hello', 'hi'] for word in words):
+            if 1 <= len(words) <= 3 and all(_ALPHA_WORD_RE.match(word) for word in words):
+                if not _YESNO_RE.search(text_lower):
                     extracted['Customer_Name'] = user_text.strip().title()
         
         # 2. PHONE NUMBER
-        phone_patterns = [
-            r'(?:\+?91[\s-]?)?([6-9]\d{9})',
-            r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})',
-        ]
-        
-        for pattern in phone_patterns:
-            match = re.search(pattern, user_text)
+        for pattern in _PHONE_PATTERNS:
+            match = pattern.search(user_text)
             if match:
-                phone = match.group(-1)
-                if len(phone) == 10 and phone[0] in '6789':
+                phone = match.group(match.lastindex)
+                if len(phone) == 10 and phone[0] in _MOBILE_FIRST:
                     extracted['Customer_Phone'] = phone
                     break
         
         # Context-aware phone extraction
-        if not extracted.get('Customer_Phone') and any(word in last_assistant_msg for word in ['phone', 'mobile', 'contact', 'number']):
-            phone_digits = re.sub(r'[^\d]', '', user_text)
-            if len(phone_digits) == 10 and phone_digits[0] in '6789':
+        if not extracted.get('Customer_Phone') and _PHONE_CUE_RE.search(last_assistant_msg):
+            phone_digits = _NON_DIGIT_RE.sub('', user_text)
+            if len(phone_digits) == 10 and phone_digits[0] in _MOBILE_FIRST:
                 extracted['Customer_Phone'] = phone_digits
         
         # 3. EMAIL
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_text)
+        email_match = _EMAIL_RE.search(user_text)
         if email_match:
             extracted['Customer_Email'] = email_match.group(0)
         
         # 4. AGE
-        age_patterns = [
-            r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})',
-            r'(\d{1,2})\s*(?:years?\s*old|yrs?)',
-            r'i am\s*(\d{1,2})'
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _AGE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 age = int(match.group(1))
                 if 21 <= age <= 75:  # Gold loan specific age range
@@ -203,7 +475,7 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
         
         # Context-aware age extraction
         if not extracted.get('Age') and 'age' in last_assistant_msg:
-            age_match = re.search(r'\b(\d{1,2})\b', user_text)
+            age_match = _BARE_AGE_RE.search(user_text)
             if age_match:
                 age = int(age_match.group(1))
                 if 21 <= age <= 75:
@@ -212,13 +484,8 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
         # 5. GOLD LOAN SPECIFIC FIELDS
         
         # Annual Income extraction
-        income_patterns = [
-            r'(?:annual.*?income|salary|earn).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:annual.*?income|salary|yearly)',
-        ]
-        
-        for pattern in income_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _INCOME_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 amount = self.convert_amount_to_number(match.group(1))
                 if amount and amount >= 180000:  # Minimum reasonable income
@@ -226,13 +493,8 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
                     break
         
         # CIBIL Score extraction
-        cibil_patterns = [
-            r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})',
-            r'(\d{3})\s*(?:cibil|credit.*?score)',
-        ]
-        
-        for pattern in cibil_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _CIBIL_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 score = int(match.group(1))
                 if 300 <= score <= 900:
@@ -240,26 +502,13 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
                     break
         
         # Occupation extraction
-        occupation_mapping = {
-            'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried', 'working': 'Salaried',
-            'retired': 'Retired', 'pension': 'Retired', 'senior': 'Retired',
-            'business': 'Business', 'businessman': 'Business', 'trader': 'Business', 'merchant': 'Business',
-            'self employed': 'Self-employed', 'self-employed': 'Self-employed', 'freelance': 'Self-employed', 'consultant': 'Self-employed'
-        }
-        
-        for keyword, occupation in occupation_mapping.items():
-            if keyword in text_lower:
-                extracted['Occupation'] = occupation
-                break
+        occupation_hits = {m.group(1) for m in _OCCUPATION_RE.finditer(text_lower)}
+        if occupation_hits:
+            extracted['Occupation'] = _OCCUPATION_KEYWORDS[min(occupation_hits, key=_OCCUPATION_RANK.__getitem__)]
         
         # Gold Value extraction
-        gold_value_patterns = [
-            r'(?:gold.*?value|gold.*?worth|jewelry.*?value).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:gold.*?value|gold.*?worth)',
-        ]
-        
-        for pattern in gold_value_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _GOLD_VALUE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 amount = self.convert_amount_to_number(match.group(1))
                 if amount and amount >= 10000:  # Minimum reasonable gold value
@@ -267,13 +516,8 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
                     break
         
         # Loan Amount extraction
-        loan_amount_patterns = [
-            r'(?:loan.*?amount|need.*?loan|want.*?loan).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:loan.*?amount|need.*?loan)',
-        ]
-        
-        for pattern in loan_amount_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _LOAN_AMOUNT_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 amount = self.convert_amount_to_number(match.group(1))
                 if amount and amount >= 5000:  # Minimum loan amount
@@ -281,245 +525,137 @@ Example: {{"Customer_Name": "John Doe", "Age": 45, "Annual_Income": 900000, "Occ
                     break
         
         # Loan Tenure extraction
-        tenure_patterns = [
-            r'(?:tenure|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?).*?(?:tenure|duration)',
-        ]
-        
-        for pattern in tenure_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _TENURE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 tenure = int(match.group(1))
                 if 1 <= tenure <= 3:  # Gold loan specific tenure range
                     extracted['Loan_Tenure'] = tenure
                     break
         
-        print(f"DEBUG - Fallback extracted: {extracted}")
+        logger.debug("Fallback extracted: %s", extracted)
         return extracted
     
     def convert_amount_to_number(self, amount_str: str) -> float:
         """Convert lakh/crore amounts to numbers with error handling"""
         if isinstance(amount_str, (int, float)):
             return float(amount_str)
-            
-        amount_str = str(amount_str).lower().strip()
-        
-        # Remove currency symbols and extra spaces
-        amount_str = re.sub(r'[₹rs\.\s]+', '', amount_str)
         
-        # Extract number and unit
-        number_match = re.search(r'([\d,]+(?:\.[\d,]+)?)', amount_str)
-        if not number_match:
+        m = _AMOUNT_FULL.search(str(amount_str).lower())
+        if not m:
             return 0.0
         
-        # Remove commas and convert to float
-        number_str = number_match.group(1).replace(',', '')
-        try:
-            number = float(number_str)
-        except ValueError:
-            return 0.0
-        
-        if 'crore' in amount_str:
+        number = float(m['num'].replace(',', ''))
+        unit = m['unit']
+        if unit == 'crore':
             return number * 10000000  # 1 crore = 1,00,00,000
-        elif 'lakh' in amount_str:
+        elif unit == 'lakh':
             return number * 100000    # 1 lakh = 1,00,000
-        else:
-            return number
+        return number
     
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, str]:
         """Validate individual field values with strict eligibility criteria"""
         try:
-            if field_name == "Customer_Name":
-                if not value or not str(value).strip():
-                    return False, "Please provide your full name."
-                name = str(value).strip()
-                if len(name) < 2:
-                    return False, "Please provide your complete name."
-                return True, ""
-                
-            elif field_name == "Customer_Email":
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, str(value)):
-                    return False, "Please provide a valid email address."
-                return True, ""
-                
-            elif field_name == "Customer_Phone":
-                phone_str = str(value).replace(' ', '').replace('-', '').replace('(', '').replace(')', '').replace('+91', '')
-                if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
-                    return False, "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
-                return True, ""
-                
-            elif field_name == "Age":
-                age = float(value)
-                if age < 21:
-                    return False, "INELIGIBLE: You must be at least 21 years old to apply for a gold loan. Unfortunately, we cannot process your application at this time."
-                elif age > 75:
-                    return False, "INELIGIBLE: Gold loans are available only for applicants up to 75 years of age. Unfortunately, we cannot process your application at this time."
-                return True, ""
-                
-            elif field_name == "CIBIL_Score":
-                cibil = float(value)
-                if cibil < 600:
-                    return False, "INELIGIBLE: A minimum CIBIL score of 600 is required for gold loan approval. Your current score does not meet our eligibility criteria."
-                elif not (300 <= cibil <= 900):
-                    return False, "Please provide a valid CIBIL score between 300 and 900. Could you check and confirm your credit score?"
-                return True, ""
-                
-            elif field_name == "Occupation":
-                valid_occupations = ["Salaried", "Retired", "Business", "Self-employed"]
-                if value not in valid_occupations:
-                    return False, f"Please select your occupation from: {', '.join(valid_occupations)}. Which category best describes your occupation?"
-                return True, ""
-                
-            elif field_name == "Annual_Income":
-                income = float(value)
-                if income <= 0:
-                    return False, "Annual income must be a positive amount. Please provide your yearly income."
-                elif income < 180000:  # Minimum 1.8 lakhs per year
-                    return False, "INELIGIBLE: Minimum annual income of ₹1,80,000 is required for gold loan eligibility."
-                elif income > 60000000:  # Maximum 6 crores per year
-                    return False, "Please verify your annual income. The amount seems unusually high. Could you confirm?"
-                return True, ""
-                
-            elif field_name == "Gold_Value":
-                value_amount = float(value)
-                if value_amount <= 0:
-                    return False, "Gold value must be a positive amount. Please provide the current market value of your gold in INR."
-                elif value_amount < 10000:  # Minimum 10k gold value
-                    return False, "INELIGIBLE: Minimum gold value of ₹10,000 is required for gold loan eligibility."
-                elif value_amount > 50000000:  # Maximum 5 crores
-                    return False, "Please verify your gold value. The amount seems unusually high. Could you confirm the current market value?"
-                return True, ""
-                
-            elif field_name == "Loan_Amount":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "Loan amount must be a positive amount. Please provide your desired loan amount in INR."
-                elif amount < 5000:  # Minimum 5k loan
-                    return False, "INELIGIBLE: Minimum loan amount of ₹5,000 is required."
-                elif amount > 10000000:  # Maximum 1 crore
-                    return False, "Please verify your loan amount. The amount seems unusually high for a gold loan."
-                return True, ""
-                
-            elif field_name == "Loan_Tenure":
-                tenure = float(value)
-                if tenure < 1:
-                    return False, "INELIGIBLE: Gold loan tenure must be at least 1 year. Please specify a tenure between 1 and 3 years."
-                elif tenure > 3:
-                    return False, "INELIGIBLE: Gold loan tenure cannot exceed 3 years. Please specify a tenure between 1 and 3 years."
-                return True, ""
-                
-            return True, ""
-            
+            return _VALIDATORS.get(field_name, _v_noop)(value)
         except (ValueError, TypeError):
             field_display = field_name.replace('_', ' ').lower()
             return False, f"Please provide a valid {field_display} in the correct format."
 
-    def prepare_model_input(self, user_input: Dict[str, Any]) -> pd.DataFrame:
-        """Prepare input data for the gold loan model"""
+    def load_models(self):
+        """Load models, then unpack the gold model package so predictions skip the dict lookups"""
+        super().load_models()
+        package = self.models.get("gold_loan_model")
+        if package:
+            self._model = package["model"]
+            self._scaler = package["scaler"]
+            self._encoder = package["encoder"]  # Label encoder for Occupation
+            self._features = package["features"]  # Feature order
+            self._targets = package["targets"]  # Target names
+            if hasattr(self._model, "get_booster"):
+                self._booster = self._model.get_booster()
+                try:
+                    # Models trained with early stopping predict with the best trees only
+                    self._iteration_range = (0, self._model.best_iteration + 1)
+                except AttributeError:
+                    self._iteration_range = (0, 0)
+    
+    def prepare_model_input(self, user_input: GoldLoanInput) -> np.ndarray:
+        """Prepare a single encoded feature row for the gold loan model"""
+        return self.prepare_model_inputs([user_input])
+    
+    def prepare_model_inputs(self, user_inputs: List[GoldLoanInput]) -> np.ndarray:
+        """Prepare an (N, n_features) encoded feature matrix, one row per applicant.
+        Accepts GoldLoanRecord objects or raw profile dicts, which are converted once here."""
         try:
-            # Convert Annual Income to Monthly Income
-            monthly_income = float(user_input['Annual_Income']) / 12
+            records = [u if isinstance(u, GoldLoanRecord) else GoldLoanRecord.from_input(u) for u in user_inputs]
             
-            # Create input dataframe matching your model's expected features
             # Model expects: ['Age', 'Occupation', 'Monthly_Income', 'CIBIL_Score', 'Gold_Value', 'Existing_EMI', 'Loan_Tenure_Years']
-            input_data = {
-                'Age': float(user_input['Age']),
-                'Occupation': user_input['Occupation'],  # Will be encoded later
-                'Monthly_Income': monthly_income,
-                'CIBIL_Score': float(user_input['CIBIL_Score']),
-                'Gold_Value': float(user_input['Gold_Value']),
+            columns = {
+                'Age': [r.age for r in records],
+                'Occupation': self._encoder.transform([r.occupation for r in records]),
+                # Convert Annual Income to Monthly Income
+                'Monthly_Income': [r.annual_income / 12 for r in records],
+                'CIBIL_Score': [r.cibil for r in records],
+                'Gold_Value': [r.gold_value for r in records],
                 'Existing_EMI': 0.0,  # Default to 0 since we don't collect this anymore
-                'Loan_Tenure_Years': float(user_input['Loan_Tenure'])
+                'Loan_Tenure_Years': [r.loan_tenure for r in records],
             }
             
-            print(f"Gold Loan Input data prepared: {input_data}")
-            
-            input_df = pd.DataFrame([input_data])
-            
-            print(f"Prepared input dataframe shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
+            logger.debug("Gold Loan Input data prepared: %s", columns)
             
-            return input_df
+            # Fill the matrix column by column in the package's feature order, ready for the scaler
+            X = np.empty((len(user_inputs), len(self._features)), dtype=np.float64)
+            for idx, feature in enumerate(self._features):
+                X[:, idx] = columns[feature]
+            return X
             
         except Exception as e:
-            print(f"Error in prepare_model_input: {e}")
+            logger.exception("Error in prepare_model_input")
             raise e
     
-    def predict_loan(self, user_input: Dict[str, Any]) -> tuple:
+    def predict_loan_batch(self, user_inputs: List[GoldLoanInput]) -> List[Tuple[float, float]]:
+        """Predict gold loan amount and interest rate for many applicants with one model call"""
+        if self._model is None:
+            raise Exception("Gold loan ML model not available. Cannot process loan prediction.")
+        if not user_inputs:
+            return []
+        
+        logger.debug("Using ML model for prediction, features: %s, targets: %s", self._features, self._targets)
+        
+        # Encoded rows already in feature order; scale and predict them together
+        X = self.prepare_model_inputs(user_inputs)
+        X_scaled = self._scaler.transform(X)
+        if self._booster is not None:
+            # Call the booster directly: skips the sklearn wrapper's per-call parameter
+            # and feature-name checks, and inplace_predict builds no DMatrix
+            predictions = self._booster.inplace_predict(
+                X_scaled, iteration_range=self._iteration_range, validate_features=False
+            )
+        else:
+            predictions = self._model.predict(X_scaled)
+        logger.debug("Raw predictions: %s", predictions)
+        
+        bounded = _bound_predictions(predictions, X[:, self._features.index('Gold_Value')])
+        return [(round(loan_amount, 0), round(interest_rate, 2)) for loan_amount, interest_rate in bounded.tolist()]
+    
+    def predict_loan(self, user_input: GoldLoanInput) -> tuple:
         """Predict gold loan amount and interest rate using ML model"""
         try:
-            print(f"Gold Loan Prediction - Input: {user_input}")
-            
-            # Prepare input data
-            input_df = self.prepare_model_input(user_input)
-            print(f"Prepared input shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
+            logger.debug("Gold Loan Prediction - Input: %s", user_input)
             
             # Try to use actual ML model if available
-            if self.models.get("gold_loan_model"):
+            if self._model is not None:
                 try:
-                    print("Using ML model for prediction...")
-                    
-                    # Load the model package - matching your structure exactly
-                    package = self.models["gold_loan_model"]
-                    model = package["model"]
-                    scaler = package["scaler"]
-                    encoder = package["encoder"]  # Label encoder for Occupation
-                    features = package["features"]  # Feature order
-                    targets = package["targets"]  # Target names
-                    
-                    print("Model components loaded successfully")
-                    print(f"Expected features: {features}")
-                    print(f"Target variables: {targets}")
-                    
-                    # Prepare data for prediction
-                    df_input = input_df.copy()
-                    
-                    # Encode Occupation using your label encoder
-                    df_input["Occupation"] = encoder.transform(df_input["Occupation"])
-                    print(f"After encoding Occupation: {df_input['Occupation'].values}")
-                    
-                    # Select features in the correct order
-                    df_input = df_input[features]
-                    print(f"After feature selection: {list(df_input.columns)}")
-                    
-                    # Scale features using your scaler
-                    df_scaled = scaler.transform(df_input)
-                    print(f"Scaled features shape: {df_scaled.shape}")
-                    
-                    # Make predictions
-                    prediction = model.predict(df_scaled)[0]
-                    print(f"Raw predictions: {prediction}")
-                    
-                    # Handle predictions as per your structure
-                    # prediction[0] = Loan_Amount
-                    # prediction[1] = Rate_of_Interest
-                    loan_amount = float(prediction[0])
-                    interest_rate = float(prediction[1])
-                    
-                    print(f"ML Prediction - Loan: Rs.{loan_amount:,.0f}, Rate: {interest_rate:.2f}%")
-                    
-                    # Ensure reasonable bounds for gold loans
-                    # Gold loans typically offer 70-80% of gold value
-                    max_loan_based_on_gold = float(user_input['Gold_Value']) * 0.8
-                    loan_amount = min(loan_amount, max_loan_based_on_gold)
-                    loan_amount = max(loan_amount, 5000)    # Min 5k
-                    interest_rate = max(8.0, min(24.0, interest_rate))   # Between 8% and 24%
-                    
-                    print(f"Final ML Prediction - Loan: Rs.{loan_amount:,.0f}, Rate: {interest_rate:.2f}%")
-                    return round(float(loan_amount), 0), round(float(interest_rate), 2)
+                    loan_amount, interest_rate = self.predict_loan_batch([user_input])[0]
+                    logger.debug("Final ML Prediction - Loan: Rs.%.0f, Rate: %.2f%%", loan_amount, interest_rate)
+                    return loan_amount, interest_rate
                     
                 except Exception as e:
-                    print(f"Model prediction error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Model prediction error")
                     raise Exception(f"ML model prediction failed: {str(e)}")
             else:
                 raise Exception("Gold loan ML model not available. Cannot process loan prediction.")
             
         except Exception as e:
-            print(f"Prediction error: {e}")
-            import traceback
-            traceback.print_exc()
-            raise Exception(f"Gold loan prediction failed: {str(e)}")
\ No newline at end of file
+            logger.error("Prediction error: %s", e)
+            raise Exception(f"Gold loan prediction failed: {str(e)}")
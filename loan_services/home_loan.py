@@ -1,13 +1,296 @@
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 import re
-import json
-from .base_loan import BaseLoanService
+import orjson
+import hashlib
+import logging
+from .base_loan import BaseLoanService, _TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for the extraction and validation hot path
+_NAME_PATTERNS = [
+    re.compile(r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})", re.IGNORECASE),
+    re.compile(r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$", re.IGNORECASE),
+]
+_ALPHA_WORD_RE = re.compile(r'^[a-zA-Z]+$')
+_PHONE_PATTERNS = [
+    re.compile(r'(?:\+?91[\s-]?)?([6-9]\d{9})'),
+    re.compile(r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})'),
+]
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+# Email patterns are ASCII-only, so compile them with re.ASCII to skip Unicode class handling
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', re.ASCII)
+_AGE_PATTERNS = [
+    re.compile(r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})'),
+    re.compile(r'(\d{1,2})\s*(?:years?\s*old|yrs?)'),
+    re.compile(r'i am\s*(\d{1,2})'),
+]
+_BARE_AGE_RE = re.compile(r'\b(\d{1,2})\b')
+# Amounts with their context cue; the cue may come before or after the amount.
+# Group names map to fields through _AMOUNT_FIELDS. Guarantor comes first so
+# "guarantor salary" is not read as the applicant's own income.
+_AMOUNT_CUE_BEFORE_RE = re.compile(
+    r'(?:(?P<guarantor>guarantor[^\d]{0,30}?(?:income|salary))'
+    r'|(?P<income>monthly[^\d]{0,30}?income|salary|earn[^\d]{0,30}?monthly)'
+    r'|(?P<down>down[^\d]{0,10}?payment|advance)'
+    r'|(?P<emi>(?:existing|current)[^\d]{0,30}?emi)'
+    r'|(?P<loan>loan[^\d]{0,10}?amount|(?:need|want)[^\d]{0,30}?loan)'
+    r'|(?P<prop>(?:property|house)[^\d]{0,20}?value|home[^\d]{0,20}?price))'
+    r'[^\d]{0,40}?(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?'
+)
+_AMOUNT_CUE_AFTER_RE = re.compile(
+    r'(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?[^\d]{0,40}?'
+    r'(?:(?P<guarantor>guarantor[^\d]{0,30}?income)'
+    r'|(?P<income>monthly[^\d]{0,30}?income|salary)'
+    r'|(?P<down>down[^\d]{0,10}?payment|advance)'
+    r'|(?P<emi>emi[^\d]{0,10}?payment)'
+    r'|(?P<loan>loan[^\d]{0,10}?amount|need[^\d]{0,30}?loan)'
+    r'|(?P<prop>property[^\d]{0,20}?value|house[^\d]{0,20}?price))'
+)
+_AMOUNT_FIELDS = (
+    ('guarantor', 'Guarantor_income'), ('income', 'Income'), ('down', 'Down_payment'),
+    ('emi', 'Existing_total_EMI'), ('loan', 'Loan_amount_requested'), ('prop', 'Property_value'),
+)
+_CIBIL_PATTERNS = [
+    re.compile(r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})'),
+    re.compile(r'(\d{3})\s*(?:cibil|credit.*?score)'),
+]
+_EMPLOYMENT_KEYWORDS = {
+    'business': 'Business Owner', 'business owner': 'Business Owner', 'entrepreneur': 'Business Owner',
+    'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried',
+    'government': 'Government Employee', 'govt': 'Government Employee', 'public sector': 'Government Employee',
+    'self employed': 'Self-Employed', 'self-employed': 'Self-Employed', 'freelance': 'Self-Employed', 'consultant': 'Self-Employed'
+}
+_EMPLOYMENT_RANK = {keyword: rank for rank, keyword in enumerate(_EMPLOYMENT_KEYWORDS)}
+# Zero-width lookahead so one scan reports every keyword, including overlapping ones
+_EMPLOYMENT_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(_EMPLOYMENT_KEYWORDS, key=len, reverse=True)) + '))'
+)
+_TENURE_PATTERNS = [
+    re.compile(r'(?:tenure|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*(?:years?|yrs?).*?(?:tenure|duration)'),
+]
+# Leading number in an amount string such as '₹5,00,000' or '1.5 lakh'
+_AMOUNT_NUMBER_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+# Multipliers indexed by unit code: 0 = rupees, 1 = lakh, 2 = crore
+_UNIT_MULTIPLIERS = np.array([1.0, 100000.0, 10000000.0])
+# Fields the patterns parse unambiguously; a valid one lets extraction skip OpenAI
+_CONFIDENT_FIELDS = ("Customer_Phone", "Customer_Email", "Age", "CIBIL_score", "Employment_type", "Tenure")
+# Separators stripped from phone numbers before validation
+_PHONE_STRIP = str.maketrans('', '', ' -()+')
+# Used with fullmatch, which anchors both ends (unlike '$', it does not accept a trailing newline)
+_EMAIL_VALIDATE_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.ASCII)
+
+_EMPLOYMENT_TYPES = ("Business Owner", "Salaried", "Government Employee", "Self-Employed")
+# Feature order used in training; Business Owner is the dropped Employment_type category
+_MODEL_FEATURES = (
+    'Age', 'Income', 'Guarantor_income', 'Tenure', 'CIBIL_score', 'Down_payment', 'Existing_total_EMI',
+    'Loan_amount_requested', 'Property_value', 'LTV', 'EMI_to_income', 'DP_ratio',
+    'Employment_type_Government Employee', 'Employment_type_Salaried', 'Employment_type_Self-Employed',
+)
+
+# Static extraction instructions, sent as the system message so the API can reuse the cached prefix
+_EXTRACTION_SYSTEM = (
+    "Extract home-loan fields from the user's reply as a JSON object. Include only fields clearly stated. "
+    "Fields: Customer_Name(str), Customer_Email(str), Customer_Phone(10-digit str, no +91/spaces/dashes), "
+    "Age(int), Income(monthly INR), Guarantor_income(monthly INR, 0 if none), Tenure(years), CIBIL_score(int), "
+    "Employment_type(one of \"Business Owner\",\"Salaried\",\"Government Employee\",\"Self-Employed\"; "
+    "map govt/business/self employed etc.), Down_payment(INR), Existing_total_EMI(monthly INR, 0 if none), "
+    "Loan_amount_requested(INR), Property_value(INR). "
+    "Units: lakh=100000, crore=10000000; give plain numbers. Output {} if nothing is found."
+)
+
+_ERR_NAME_EMPTY = "Please provide your full name."
+_ERR_NAME_SHORT = "Please provide your complete name."
+_ERR_EMAIL = "Please provide a valid email address."
+_ERR_PHONE = "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
+_ERR_AGE = "I need your age to be between 21 and 50 years for home loan eligibility. Could you please confirm your age?"
+_ERR_CIBIL_LOW = "Sorry, for home loans we require a minimum CIBIL score of 650. Unfortunately, your current score doesn't meet our eligibility criteria."
+_ERR_CIBIL_RANGE = "Your CIBIL score should be between 300 and 900. Could you please check and provide your correct credit score?"
+_ERR_EMPLOYMENT = f"For employment type, please choose from: {', '.join(_EMPLOYMENT_TYPES)}. Which category best describes your employment?"
+_ERR_TENURE = "Loan tenure should be between 5 and 30 years. How many years would you like to repay the loan?"
+_ERR_INCOME = "Could you please tell me your monthly income? This helps me calculate your loan eligibility."
+_ERR_PROPERTY = "What's the total value of the property you're planning to purchase? This is important for calculating your loan amount."
+_ERR_LOAN_AMOUNT = "How much loan amount are you looking for? Please share your expected loan requirement."
+_ERR_DOWN_PAYMENT = "How much can you pay as down payment? Even if it's zero, please let me know."
+_ERR_GUARANTOR = "Guarantor income cannot be negative. Please provide the guarantor's monthly income (enter 0 if no guarantor)."
+_ERR_EMI = "Existing EMI cannot be negative. Please provide your current monthly EMI obligations (enter 0 if none)."
+
+
+def _v_noop(value: Any) -> Tuple[bool, str]:
+    return True, ""
+
+def _v_name(value: Any) -> Tuple[bool, str]:
+    if not value or not str(value).strip():
+        return False, _ERR_NAME_EMPTY
+    if len(str(value).strip()) < 2:
+        return False, _ERR_NAME_SHORT
+    return True, ""
+
+def _v_email(value: Any) -> Tuple[bool, str]:
+    if not _EMAIL_VALIDATE_RE.fullmatch(str(value)):
+        return False, _ERR_EMAIL
+    return True, ""
+
+def _v_phone(value: Any) -> Tuple[bool, str]:
+    phone_str = str(value).translate(_PHONE_STRIP)
+    if len(phone_str) == 12 and phone_str.startswith('91'):
+        phone_str = phone_str[2:]
+    if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
+        return False, _ERR_PHONE
+    return True, ""
+
+def _v_age(value: Any) -> Tuple[bool, str]:
+    if not (21 <= float(value) <= 50):
+        return False, _ERR_AGE
+    return True, ""
+
+def _v_cibil(value: Any) -> Tuple[bool, str]:
+    cibil = float(value)
+    if cibil < 650:
+        return False, _ERR_CIBIL_LOW
+    elif not (300 <= cibil <= 900):
+        return False, _ERR_CIBIL_RANGE
+    return True, ""
+
+def _v_employment(value: Any) -> Tuple[bool, str]:
+    if value not in _EMPLOYMENT_TYPES:
+        return False, _ERR_EMPLOYMENT
+    return True, ""
+
+def _v_tenure(value: Any) -> Tuple[bool, str]:
+    if not (5 <= float(value) <= 30):
+        return False, _ERR_TENURE
+    return True, ""
+
+def _positive(message: str):
+    """Validator for amounts that must be greater than zero"""
+    def validate(value: Any) -> Tuple[bool, str]:
+        if float(value) <= 0:
+            return False, message
+        return True, ""
+    return validate
+
+def _non_negative(message: str):
+    """Validator for amounts that may be zero but not negative"""
+    def validate(value: Any) -> Tuple[bool, str]:
+        if float(value) < 0:
+            return False, message
+        return True, ""
+    return validate
+
+_VALIDATORS = {
+    "Customer_Name": _v_name,
+    "Customer_Email": _v_email,
+    "Customer_Phone": _v_phone,
+    "Age": _v_age,
+    "CIBIL_score": _v_cibil,
+    "Employment_type": _v_employment,
+    "Tenure": _v_tenure,
+    "Income": _positive(_ERR_INCOME),
+    "Property_value": _positive(_ERR_PROPERTY),
+    "Loan_amount_requested": _positive(_ERR_LOAN_AMOUNT),
+    "Down_payment": _non_negative(_ERR_DOWN_PAYMENT),
+    "Guarantor_income": _non_negative(_ERR_GUARANTOR),
+    "Existing_total_EMI": _non_negative(_ERR_EMI),
+}
+
+
+def _read_json_stream(stream) -> str:
+    """Collect streamed completion text up to the end of the first top-level JSON object,
+    then close the stream so trailing tokens are never read"""
+    parts = []
+    depth = 0
+    in_string = escaped = False
+    with stream:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for i, ch in enumerate(delta):
+                if in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == '\\':
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                    if depth == 0:
+                        parts.append(delta[:i + 1])
+                        return ''.join(parts)
+            parts.append(delta)
+    return ''.join(parts)
+
+
+def _split_amount(amount_str: str) -> Tuple[float, int]:
+    """Split an amount string like '5.5 lakh' into (value, unit_code)"""
+    text = str(amount_str).lower()
+    number_match = _AMOUNT_NUMBER_RE.search(text)
+    if not number_match:
+        return 0.0, 0
+    number = float(number_match.group(1).replace(',', ''))
+    if 'crore' in text:
+        return number, 2
+    elif 'lakh' in text:
+        return number, 1
+    return number, 0
+
+
+def _employment_onehot_rows(feature_names: List[str]) -> Dict[str, np.ndarray]:
+    """One float32 row per employment type with its Employment_type_* column set; the dropped base category stays all zero"""
+    onehot = {}
+    for employment in _EMPLOYMENT_TYPES:
+        vec = np.zeros(len(feature_names), dtype=np.float32)
+        column = f"Employment_type_{employment}"
+        if column in feature_names:
+            vec[feature_names.index(column)] = 1.0
+        onehot[employment] = vec
+    return onehot
+
+
+def _iteration_range(model) -> Tuple[int, int]:
+    """Tree range an XGBoost sklearn model predicts with; early-stopped models use the best trees only"""
+    try:
+        return (0, model.best_iteration + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+def _amount_from_parts(number_str: str, unit: Optional[str]) -> float:
+    """Turn a captured number and optional lakh/crore unit into rupees"""
+    try:
+        number = float(number_str.replace(',', ''))
+    except ValueError:
+        return 0.0
+    if unit and unit.startswith('crore'):
+        return number * 10000000  # 1 crore = 1,00,00,000
+    elif unit and unit.startswith('lakh'):
+        return number * 100000    # 1 lakh = 1,00,000
+    return number
+
 
 class HomeLoanService(BaseLoanService):
     """Home Loan Service with XGBoost Model Integration"""
     
+    # Prediction state filled in by load_models; fixed slots instead of a per-instance __dict__
+    __slots__ = (
+        '_feature_names', '_feature_index', '_employment_onehot',
+        '_loan_booster', '_rate_booster', '_single_row_boosters', '_loan_iteration_range', '_rate_iteration_range',
+    )
+    
+    # OpenAI extractions keyed on (model, last assistant message digest, whitespace-normalized user text);
+    # the call runs at temperature 0, so repeated short replies reuse the earlier result
+    _extraction_cache = _TTLCache(maxsize=4096, ttl=86400)
+    
     def get_required_fields(self) -> List[str]:
         return [
             "Customer_Name",
@@ -25,6 +308,38 @@ class HomeLoanService(BaseLoanService):
             "Property_value",  # Changed from Property_Value to match model
         ]
     
+    def load_models(self):
+        """Load models, then record their feature layout so inputs can be built as numpy rows"""
+        super().load_models()
+        # Model feature order and each feature's column position, defaulting to the training order
+        self._feature_names: List[str] = list(_MODEL_FEATURES)
+        self._feature_index: Dict[str, int] = {name: i for i, name in enumerate(_MODEL_FEATURES)}
+        # Employment_type -> its one-hot block as a full-width row, so encoding is one vector add
+        self._employment_onehot: Dict[str, np.ndarray] = _employment_onehot_rows(self._feature_names)
+        # Underlying XGBoost boosters and the tree range the sklearn wrappers would predict with
+        self._loan_booster = None
+        self._rate_booster = None
+        self._single_row_boosters = None
+        self._loan_iteration_range = self._rate_iteration_range = (0, 0)
+        
+        loan_model = self.models.get("loan_amount_model")
+        if loan_model is not None and hasattr(loan_model, 'feature_names_in_'):
+            self._feature_names = [str(name) for name in loan_model.feature_names_in_]
+            self._feature_index = {name: i for i, name in enumerate(self._feature_names)}
+            self._employment_onehot = _employment_onehot_rows(self._feature_names)
+        rate_model = self.models.get("interest_rate_model")
+        if hasattr(loan_model, "get_booster") and hasattr(rate_model, "get_booster"):
+            self._loan_booster = loan_model.get_booster()
+            self._rate_booster = rate_model.get_booster()
+            self._loan_iteration_range = _iteration_range(loan_model)
+            self._rate_iteration_range = _iteration_range(rate_model)
+            # Single-row predictions run on private single-thread copies, avoiding OpenMP
+            # fork/join per call without touching the shared boosters the batch path uses
+            single_row_boosters = (self._loan_booster.copy(), self._rate_booster.copy())
+            for booster in single_row_boosters:
+                booster.set_param({'nthread': 1})
+            self._single_row_boosters = single_row_boosters
+    
     def get_model_files(self) -> Dict[str, str]:
         return {
             "loan_amount_model": "loan_amount_model.pkl",
@@ -68,90 +383,98 @@ Start by introducing yourself as a home loan specialist and asking about their h
     def get_fallback_greeting(self) -> str:
         return "Hello! I'm a home loan specialist. I'm here to help you with your home loan application. Let's start with your full name - what should I call you?"
     
-    def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
-        return f"""
-Based on the conversation history and the user's latest response, extract any home loan-related information.
-
-Conversation so far: {conversation[-3:] if len(conversation) > 3 else conversation}
-
-User's latest response: "{user_text}"
-
-Extract information for these fields (only if clearly mentioned):
-
-Customer Information:
-- Customer_Name: full name as string
-- Customer_Email: email address as string  
-- Customer_Phone: 10-digit phone number as string (remove +91, spaces, dashes)
-
-Loan Information:
-- Age: number (21-50, strict requirement)
-- Income: number in INR (monthly income, must be positive)
-- Guarantor_income: number in INR (guarantor's monthly income, 0 if none)
-- Tenure: number (loan term in years, 5-30)
-- CIBIL_score: number (minimum 650 required)
-- Employment_type: exactly one of ["Business Owner", "Salaried", "Government Employee", "Self-Employed"]
-- Down_payment: number in INR (upfront payment amount)
-- Existing_total_EMI: number in INR (current monthly EMIs, 0 if none)
-- Loan_amount_requested: number in INR (desired loan amount)
-- Property_value: number in INR (total property value)
-
-Important:
-- For Employment_type, map variations like "business", "govt", "self employed" to exact options
-- Convert lakhs/crores to actual numbers (e.g., "50 lakhs" = 5000000)
-- Extract only information that is clearly stated
-
-Return ONLY a JSON object with the extracted fields. If no information is found, return empty JSON {{}}.
-Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_type": "Salaried", "Income": 80000, "Property_value": 5000000}}
-""".strip()
+    def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]],
+                              last_assistant_msg: Optional[str] = None) -> str:
+        """User message for extraction; the field catalogue is sent separately as _EXTRACTION_SYSTEM"""
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
+        return f"Prev assistant: {last_assistant_msg[:200]}\nUser: {user_text}"
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with enhanced fallback logic"""
-        print(f"DEBUG - Starting extraction for: '{user_text}'")
-        
-        # Try OpenAI first if available
+        logger.debug("Starting extraction for: '%s'", user_text)
+        # The app passes the tracked question; only scan the history when called without it
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
+        
+        # Cheap pattern pass first: a valid phone, email, age, CIBIL score, employment type or
+        # tenure that answers the question being asked needs no OpenAI round trip
+        quick = self._enhanced_fallback_extraction(user_text, conversation, last_assistant_msg)
+        if self._is_confident(quick, current_field):
+            logger.debug("Prefilter extracted: %s", quick)
+            return quick
+        
+        # Try OpenAI if available
         if self.client:
-            extraction_prompt = self.get_extraction_prompt(user_text, conversation)
+            context_digest = hashlib.blake2b(last_assistant_msg.encode(), digest_size=16).digest()
+            cache_key = ("gpt-4o-mini", context_digest, " ".join(user_text.split()))
+            cached = self._extraction_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Cached extraction: %s", cached)
+                return dict(cached)
+            
+            extraction_prompt = self.get_extraction_prompt(user_text, conversation, last_assistant_msg)
             
             try:
                 resp = self.client.chat.completions.create(
                     model="gpt-4o-mini",
-                    messages=[{"role": "user", "content": extraction_prompt}],
-                    temperature=0
+                    messages=[
+                        {"role": "system", "content": _EXTRACTION_SYSTEM},
+                        {"role": "user", "content": extraction_prompt},
+                    ],
+                    temperature=0,
+                    max_tokens=150,  # the reply is a small JSON object
+                    response_format={"type": "json_object"},
+                    timeout=8,  # bound how long a chat worker thread waits on the API
+                    stream=True
                 )
-                extracted_text = resp.choices[0].message.content.strip()
-                m = re.search(r"\{.*\}", extracted_text, re.DOTALL)
-                if m:
-                    extracted = json.loads(m.group())
-                    print(f"DEBUG - OpenAI extracted: {extracted}")
-                    if extracted:  # Only return if we got something useful
-                        return extracted
+                # JSON mode guarantees a single object; stop reading as soon as it closes
+                extracted = orjson.loads(_read_json_stream(resp))
+                logger.debug("OpenAI extracted: %s", extracted)
+                if extracted:  # Only return if we got something useful
+                    self._extraction_cache.set(cache_key, dict(extracted))
+                    return extracted
             except Exception as e:
-                print(f"DEBUG - OpenAI extraction failed: {e}")
+                logger.debug("OpenAI extraction failed: %s", e)
         
         # Enhanced fallback extraction
-        return self._enhanced_fallback_extraction(user_text, conversation)
+        return quick
     
-    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _is_confident(self, extracted: Dict[str, Any], current_field: Optional[str]) -> bool:
+        """True when extracted covers the asked-for field and holds at least one valid high-confidence field"""
+        if current_field and current_field not in extracted:
+            return False
+        # The bare-word name pattern also fires on replies like "salaried"; an unrequested name is ambiguous
+        if 'Customer_Name' in extracted and current_field != 'Customer_Name':
+            return False
+        return any(
+            field in extracted and self.validate_field(field, extracted[field])[0]
+            for field in _CONFIDENT_FIELDS
+        )
+    
+    def _get_last_assistant_msg(self, conversation: List[Dict[str, str]]) -> str:
+        """Return the most recent assistant message, lowercased"""
+        for msg in reversed(conversation):
+            if msg.get('role') == 'assistant':
+                return msg.get('content', '').lower()
+        return ""
+    
+    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]],
+                                      last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Enhanced fallback extraction with context awareness"""
         extracted = {}
         text_lower = user_text.lower().strip()
+        # Every remaining field but name, email and employment type needs a digit
+        digits_only = _NON_DIGIT_RE.sub('', user_text)
         
-        # Get context from last assistant message
-        last_assistant_msg = ""
-        if len(conversation) > 0:
-            for msg in reversed(conversation):
-                if msg.get('role') == 'assistant':
-                    last_assistant_msg = msg.get('content', '').lower()
-                    break
+        # Get context from last assistant message, unless the caller already tracks it
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
         
         # 1. CUSTOMER NAME
-        name_patterns = [
-            r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})",
-            r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$",
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_text, re.IGNORECASE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(user_text)
             if match:
                 name = match.group(1).strip().title()
                 if not any(word in name.lower() for word in ['years', 'old', 'work', 'job', 'score']):
@@ -161,45 +484,42 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_type": "Salaried"
         # Context-aware name extraction
         if not extracted.get('Customer_Name') and ('name' in last_assistant_msg or 'call you' in last_assistant_msg):
             words = user_text.strip().split()
-            if 1 <= len(words) <= 3 and all(re.match(r'^[a-zA-Z]+$', word) for word in words):
+            if 1 <= len(words) <= 3 and all(_ALPHA_WORD_RE.match(word) for word in words):
                 if not any(word.lower() in ['yes', 'no', 'ok', 'sure', 'hello', 'hi'] for word in words):
                     extracted['Customer_Name'] = user_text.strip().title()
         
-        # 2. PHONE NUMBER
-        phone_patterns = [
-            r'(?:\+?91[\s-]?)?([6-9]\d{9})',
-            r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})',
-        ]
+        # 2. EMAIL
+        email_match = _EMAIL_RE.search(user_text)
+        if email_match:
+            extracted['Customer_Email'] = email_match.group(0)
+        
+        # 3. EMPLOYMENT TYPE
+        employment_hits = {m.group(1) for m in _EMPLOYMENT_RE.finditer(text_lower)}
+        if employment_hits:
+            extracted['Employment_type'] = _EMPLOYMENT_KEYWORDS[min(employment_hits, key=_EMPLOYMENT_RANK.__getitem__)]
         
-        for pattern in phone_patterns:
-            match = re.search(pattern, user_text)
+        # Replies without any digit ("salaried", a name) have nothing left for the numeric patterns
+        if not digits_only:
+            logger.debug("Fallback extracted: %s", extracted)
+            return extracted
+        
+        # 4. PHONE NUMBER
+        for pattern in _PHONE_PATTERNS:
+            match = pattern.search(user_text)
             if match:
-                phone = match.group(-1)
+                phone = match.group(match.lastindex)  # number is the last group in both patterns
                 if len(phone) == 10 and phone[0] in '6789':
                     extracted['Customer_Phone'] = phone
                     break
         
         # Context-aware phone extraction
         if not extracted.get('Customer_Phone') and any(word in last_assistant_msg for word in ['phone', 'mobile', 'contact', 'number']):
-            phone_digits = re.sub(r'[^\d]', '', user_text)
-            if len(phone_digits) == 10 and phone_digits[0] in '6789':
-                extracted['Customer_Phone'] = phone_digits
-        
-        # 3. EMAIL
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_text)
-        if email_match:
-            extracted['Customer_Email'] = email_match.group(0)
-        
-        # 4. AGE
-        age_patterns = [
-            r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})',
-            r'(\d{1,2})\s*(?:years?\s*old|yrs?)',
-            r'i am\s*(\d{1,2})'
-        ]
+            if len(digits_only) == 10 and digits_only[0] in '6789':
+                extracted['Customer_Phone'] = digits_only
         
-        for pattern in age_patterns:
-            match = re.search(pattern, text_lower)
+        # 5. AGE
+        for pattern in _AGE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 age = int(match.group(1))
                 if 21 <= age <= 50:  # Home loan specific age range
@@ -208,258 +528,69 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_type": "Salaried"
         
         # Context-aware age extraction
         if not extracted.get('Age') and 'age' in last_assistant_msg:
-            age_match = re.search(r'\b(\d{1,2})\b', user_text)
+            age_match = _BARE_AGE_RE.search(user_text)
             if age_match:
                 age = int(age_match.group(1))
                 if 21 <= age <= 50:
                     extracted['Age'] = age
         
-        # 5. HOME LOAN SPECIFIC FIELDS
+        # 6. HOME LOAN SPECIFIC FIELDS
         
-        # Monthly Income extraction
-        income_patterns = [
-            r'(?:monthly.*?income|salary|earn.*?monthly).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:monthly.*?income|salary)',
-        ]
-        
-        for pattern in income_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Income'] = amount
-                    break
-        
-        # Guarantor Income extraction
-        guarantor_patterns = [
-            r'(?:guarantor.*?income|guarantor.*?salary).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:guarantor.*?income)',
-        ]
-        
-        for pattern in guarantor_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 0:
-                    extracted['Guarantor_income'] = amount
-                    break
+        # Income, guarantor income, down payment, existing EMI, loan amount and property value
+        # in one scan per cue position; the earliest cue-before-amount match wins for each field
+        for pattern in (_AMOUNT_CUE_BEFORE_RE, _AMOUNT_CUE_AFTER_RE):
+            for match in pattern.finditer(text_lower):
+                field = next(f for group, f in _AMOUNT_FIELDS if match.group(group))
+                if field not in extracted:
+                    amount = _amount_from_parts(match.group('num'), match.group('unit'))
+                    if amount > 0:
+                        extracted[field] = amount
         
         # CIBIL Score extraction
-        cibil_patterns = [
-            r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})',
-            r'(\d{3})\s*(?:cibil|credit.*?score)',
-        ]
-        
-        for pattern in cibil_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _CIBIL_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 score = int(match.group(1))
                 if 300 <= score <= 900:
                     extracted['CIBIL_score'] = score
                     break
         
-        # Employment Type extraction
-        employment_mapping = {
-            'business': 'Business Owner', 'business owner': 'Business Owner', 'entrepreneur': 'Business Owner',
-            'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried',
-            'government': 'Government Employee', 'govt': 'Government Employee', 'public sector': 'Government Employee',
-            'self employed': 'Self-Employed', 'self-employed': 'Self-Employed', 'freelance': 'Self-Employed', 'consultant': 'Self-Employed'
-        }
-        
-        for keyword, employment in employment_mapping.items():
-            if keyword in text_lower:
-                extracted['Employment_type'] = employment
-                break
-        
-        # Down Payment extraction
-        down_payment_patterns = [
-            r'(?:down.*?payment|advance).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:down.*?payment|advance)',
-        ]
-        
-        for pattern in down_payment_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 0:
-                    extracted['Down_payment'] = amount
-                    break
-        
-        # Existing EMI extraction
-        emi_patterns = [
-            r'(?:existing.*?emi|current.*?emi).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:emi.*?payment)',
-        ]
-        
-        for pattern in emi_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 0:
-                    extracted['Existing_total_EMI'] = amount
-                    break
-        
-        # Loan Amount extraction
-        loan_amount_patterns = [
-            r'(?:loan.*?amount|need.*?loan|want.*?loan).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:loan.*?amount|need.*?loan)',
-        ]
-        
-        for pattern in loan_amount_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Loan_amount_requested'] = amount
-                    break
-        
-        # Property Value extraction
-        property_patterns = [
-            r'(?:property.*?value|house.*?value|home.*?price).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:property.*?value|house.*?price)',
-        ]
-        
-        for pattern in property_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount > 0:
-                    extracted['Property_value'] = amount
-                    break
-        
         # Tenure extraction
-        tenure_patterns = [
-            r'(?:tenure|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?).*?(?:tenure|duration)',
-        ]
-        
-        for pattern in tenure_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _TENURE_PATTERNS:
+            match = pattern.search(text_lower)
             if match:
                 tenure = int(match.group(1))
                 if 5 <= tenure <= 30:  # Home loan specific tenure range
                     extracted['Tenure'] = tenure
                     break
         
-        print(f"DEBUG - Fallback extracted: {extracted}")
+        logger.debug("Fallback extracted: %s", extracted)
         return extracted
     
     def convert_amount_to_number(self, amount_str: str) -> float:
         """Convert lakh/crore amounts to numbers with error handling"""
         if isinstance(amount_str, (int, float)):
             return float(amount_str)
-            
-        amount_str = str(amount_str).lower().strip()
         
-        # Remove currency symbols and extra spaces
-        amount_str = re.sub(r'[₹rs\.\s]+', '', amount_str)
-        
-        # Extract number and unit
-        number_match = re.search(r'([\d,]+(?:\.[\d,]+)?)', amount_str)
-        if not number_match:
-            return 0.0
-        
-        # Remove commas and convert to float
-        number_str = number_match.group(1).replace(',', '')
-        try:
-            number = float(number_str)
-        except ValueError:
-            return 0.0
-        
-        if 'crore' in amount_str:
-            return number * 10000000  # 1 crore = 1,00,00,000
-        elif 'lakh' in amount_str:
-            return number * 100000    # 1 lakh = 1,00,000
-        else:
-            return number
+        number, unit_code = _split_amount(amount_str)
+        return float(number * _UNIT_MULTIPLIERS[unit_code])
+    
+    def convert_amounts_to_numbers(self, amount_strs: List[Any]) -> np.ndarray:
+        """Batch version of convert_amount_to_number for bulk reprocessing of chat logs.
+        Parses each string once, then applies the lakh/crore multipliers in a single vectorized pass."""
+        numbers = np.zeros(len(amount_strs))
+        unit_codes = np.zeros(len(amount_strs), dtype=np.intp)
+        for i, amount_str in enumerate(amount_strs):
+            if isinstance(amount_str, (int, float)):
+                numbers[i] = amount_str
+            else:
+                numbers[i], unit_codes[i] = _split_amount(amount_str)
+        return numbers * _UNIT_MULTIPLIERS[unit_codes]
     
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, str]:
         """Validate individual field values with user-friendly messages"""
         try:
-            if field_name == "Customer_Name":
-                if not value or not str(value).strip():
-                    return False, "Please provide your full name."
-                name = str(value).strip()
-                if len(name) < 2:
-                    return False, "Please provide your complete name."
-                return True, ""
-                
-            elif field_name == "Customer_Email":
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, str(value)):
-                    return False, "Please provide a valid email address."
-                return True, ""
-                
-            elif field_name == "Customer_Phone":
-                phone_str = str(value).replace(' ', '').replace('-', '').replace('(', '').replace(')', '').replace('+91', '')
-                if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
-                    return False, "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
-                return True, ""
-                
-            elif field_name == "Age":
-                age = float(value)
-                if not (21 <= age <= 50):
-                    return False, "I need your age to be between 21 and 50 years for home loan eligibility. Could you please confirm your age?"
-                return True, ""
-                
-            elif field_name == "CIBIL_score":
-                cibil = float(value)
-                if cibil < 650:
-                    return False, "Sorry, for home loans we require a minimum CIBIL score of 650. Unfortunately, your current score doesn't meet our eligibility criteria."
-                elif not (300 <= cibil <= 900):
-                    return False, "Your CIBIL score should be between 300 and 900. Could you please check and provide your correct credit score?"
-                return True, ""
-                
-            elif field_name == "Employment_type":
-                valid_types = ["Business Owner", "Salaried", "Government Employee", "Self-Employed"]
-                if value not in valid_types:
-                    return False, f"For employment type, please choose from: {', '.join(valid_types)}. Which category best describes your employment?"
-                return True, ""
-                
-            elif field_name == "Tenure":
-                tenure = float(value)
-                if not (5 <= tenure <= 30):
-                    return False, "Loan tenure should be between 5 and 30 years. How many years would you like to repay the loan?"
-                return True, ""
-                
-            elif field_name == "Income":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "Could you please tell me your monthly income? This helps me calculate your loan eligibility."
-                return True, ""
-                
-            elif field_name == "Property_value":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "What's the total value of the property you're planning to purchase? This is important for calculating your loan amount."
-                return True, ""
-                
-            elif field_name == "Loan_amount_requested":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "How much loan amount are you looking for? Please share your expected loan requirement."
-                return True, ""
-                
-            elif field_name == "Down_payment":
-                amount = float(value)
-                if amount < 0:
-                    return False, "How much can you pay as down payment? Even if it's zero, please let me know."
-                return True, ""
-                
-            elif field_name == "Guarantor_income":
-                amount = float(value)
-                if amount < 0:
-                    return False, "Guarantor income cannot be negative. Please provide the guarantor's monthly income (enter 0 if no guarantor)."
-                return True, ""
-                
-            elif field_name == "Existing_total_EMI":
-                amount = float(value)
-                if amount < 0:
-                    return False, "Existing EMI cannot be negative. Please provide your current monthly EMI obligations (enter 0 if none)."
-                return True, ""
-                
-            return True, ""
-            
+            return _VALIDATORS.get(field_name, _v_noop)(value)
         except (ValueError, TypeError):
             field_display = field_name.replace('_', ' ').lower()
             return False, f"I didn't quite understand the {field_display}. Could you please provide it in a clear format?"
@@ -480,91 +611,111 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_type": "Salaried"
         except (ValueError, TypeError) as e:
             return False, "There was an error validating your information. Please check all the values you provided."
     
-    def prepare_model_input(self, user_input: Dict[str, Any]) -> pd.DataFrame:
-        """Prepare input data for the XGBoost model with feature engineering"""
+    def prepare_model_input(self, user_input: Dict[str, Any]) -> np.ndarray:
+        """Prepare a (1, n_features) float32 row for the XGBoost models with feature engineering"""
+        return self.prepare_model_inputs([user_input])
+    
+    def prepare_model_inputs(self, user_inputs: List[Dict[str, Any]]) -> np.ndarray:
+        """Prepare an (N, n_features) float32 matrix, one row per applicant"""
+        X = np.zeros((len(user_inputs), len(self._feature_names)), dtype=np.float32)
+        for row, user_input in zip(X, user_inputs):
+            self._fill_model_row(row, user_input)
+        return X
+    
+    def _fill_model_row(self, row: np.ndarray, user_input: Dict[str, Any]) -> None:
+        """Write one applicant's engineered features into a zeroed row"""
         try:
             # Validate complete data first
             is_valid, error_msg = self.validate_complete_data(user_input)
             if not is_valid:
                 raise ValueError(error_msg)
             
-            # Create input dataframe
+            guarantor_income = float(user_input.get('Guarantor_income', 0))
             input_data = {
                 'Age': float(user_input['Age']),
                 'Income': float(user_input['Income']),
-                'Guarantor_income': float(user_input.get('Guarantor_income', 0)),
+                'Guarantor_income': 0.0 if np.isnan(guarantor_income) else guarantor_income,
                 'Tenure': float(user_input['Tenure']),
                 'CIBIL_score': float(user_input['CIBIL_score']),
                 'Down_payment': float(user_input['Down_payment']),
                 'Existing_total_EMI': float(user_input.get('Existing_total_EMI', 0)),
                 'Loan_amount_requested': float(user_input['Loan_amount_requested']),
                 'Property_value': float(user_input['Property_value']),
-                'Employment_type': user_input['Employment_type']
             }
             
-            print(f"Home Loan Input data prepared: {input_data}")
-            
-            input_df = pd.DataFrame([input_data])
-            
-            # Ensure Guarantor_income is numeric
-            input_df['Guarantor_income'] = pd.to_numeric(input_df['Guarantor_income'], errors='coerce').fillna(0)
+            logger.debug("Home Loan Input data prepared: %s", input_data)
             
             # Feature Engineering: Calculate ratios (matching training code)
-            input_df['LTV'] = input_df['Loan_amount_requested'] / input_df['Property_value']
-            input_df['EMI_to_income'] = input_df['Existing_total_EMI'] / input_df['Income']
-            input_df['DP_ratio'] = input_df['Down_payment'] / input_df['Property_value']
+            input_data['LTV'] = input_data['Loan_amount_requested'] / input_data['Property_value']
+            input_data['EMI_to_income'] = input_data['Existing_total_EMI'] / input_data['Income']
+            input_data['DP_ratio'] = input_data['Down_payment'] / input_data['Property_value']
             
-            print(f"After feature engineering: LTV={input_df['LTV'].iloc[0]:.3f}, EMI_to_income={input_df['EMI_to_income'].iloc[0]:.3f}")
+            logger.debug("After feature engineering: LTV=%.3f, EMI_to_income=%.3f", input_data['LTV'], input_data['EMI_to_income'])
             
-            # One-hot encode Employment_type (matching training code)
-            input_df = pd.get_dummies(input_df, columns=['Employment_type'], drop_first=True)
+            # Fill the row by column position in the models' feature order
+            for name, value in input_data.items():
+                row[self._feature_index[name]] = value
             
-            print(f"Final prepared dataframe shape: {input_df.shape}")
-            return input_df
+            # One-hot Employment_type (matching training code) from the precomputed vectors
+            row += self._employment_onehot[user_input['Employment_type']]
             
         except Exception as e:
-            print(f"Error in prepare_model_input: {e}")
+            logger.exception("Error in prepare_model_input")
             raise e
     
+    def _predict_rows(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Loan amounts and interest rates for prepared rows, one model call each"""
+        # Rows are already laid out in the models' training column order
+        if self._loan_booster is not None:
+            if len(X) == 1:
+                loan_booster, rate_booster = self._single_row_boosters
+            else:
+                loan_booster, rate_booster = self._loan_booster, self._rate_booster
+            # Call the boosters directly: skips the sklearn wrapper's per-call parameter
+            # and feature-name checks, and inplace_predict builds no DMatrix
+            loans = loan_booster.inplace_predict(
+                X, iteration_range=self._loan_iteration_range, validate_features=False
+            )
+            rates = rate_booster.inplace_predict(
+                X, iteration_range=self._rate_iteration_range, validate_features=False
+            )
+            return loans, rates
+        return self.models["loan_amount_model"].predict(X), self.models["interest_rate_model"].predict(X)
+    
+    def predict_loan_batch(self, user_inputs: List[Dict[str, Any]]) -> List[Tuple[float, float]]:
+        """Predict home loan amount and interest rate for many applicants with one call per model"""
+        if not (self.models.get("loan_amount_model") and self.models.get("interest_rate_model")):
+            raise Exception("ML models not loaded. Please ensure loan_amount_model.pkl and interest_rate_model.pkl are available in models/home_loan_models/")
+        if not user_inputs:
+            return []
+        
+        loans, rates = self._predict_rows(self.prepare_model_inputs(user_inputs))
+        return [(round(loan, 0), round(rate, 2)) for loan, rate in zip(loans.tolist(), rates.tolist())]
+    
     def predict_loan(self, user_input: Dict[str, Any]) -> tuple:
         """Predict home loan amount and interest rate using XGBoost models"""
         try:
-            print(f"Home Loan Prediction - Input: {user_input}")
+            logger.debug("Home Loan Prediction - Input: %s", user_input)
             
             # Prepare input data with feature engineering
-            input_df = self.prepare_model_input(user_input)
-            print(f"Prepared input shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
+            input_row = self.prepare_model_input(user_input)
             
             # Try to use actual ML models if available
             if self.models.get("loan_amount_model") and self.models.get("interest_rate_model"):
                 try:
-                    print("Using ML models for prediction...")
-                    # Get the training columns from the first model to align features
-                    loan_model = self.models["loan_amount_model"]
-                    rate_model = self.models["interest_rate_model"]
-                    
-                    # Ensure input has all required columns (fill missing with 0)
-                    if hasattr(loan_model, 'feature_names_in_'):
-                        required_cols = loan_model.feature_names_in_
-                        input_df = input_df.reindex(columns=required_cols, fill_value=0)
-                        print(f"Aligned to model columns: {len(required_cols)} features")
-                    
-                    # Make predictions
-                    predicted_loan = loan_model.predict(input_df)[0]
-                    predicted_rate = rate_model.predict(input_df)[0]
+                    logger.debug("Using ML models for prediction...")
+                    loans, rates = self._predict_rows(input_row)
+                    predicted_loan, predicted_rate = loans[0], rates[0]
                     
-                    print(f"ML Prediction - Loan: Rs.{predicted_loan:,.0f}, Rate: {predicted_rate:.2f}%")
+                    logger.debug("ML Prediction - Loan: Rs.%.0f, Rate: %.2f%%", predicted_loan, predicted_rate)
                     return round(float(predicted_loan), 0), round(float(predicted_rate), 2)
                     
                 except Exception as e:
-                    print(f"🏠 Model prediction error: {e}")
+                    logger.exception("Model prediction error")
                     raise Exception(f"ML model prediction failed: {str(e)}")
             else:
                 raise Exception("ML models not loaded. Please ensure loan_amount_model.pkl and interest_rate_model.pkl are available in models/home_loan_models/")
             
         except Exception as e:
-            print(f"🏠 Prediction error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Prediction error: %s", e)
             raise Exception(f"Home loan prediction failed: {str(e)}")
\ No newline at end of file
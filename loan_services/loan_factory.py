@@ -1,17 +1,46 @@
-from typing import Dict, Optional, Type
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
 import os
+import threading
+import weakref
 from .education_loan import EducationLoanService
 from .home_loan import HomeLoanService
 from .personal_loan import PersonalLoanService
 from .gold_loan import GoldLoanService
 from .business_loan import BusinessLoanService
 from .car_loan import CarLoanService
-from .base_loan import BaseLoanService
+from .base_loan import BaseLoanService, _TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Model directories rarely appear or vanish at runtime; a short TTL spares the
+# per-call stat without hiding a change for long
+_EXISTS_CACHE = _TTLCache(maxsize=64, ttl=5.0)
+
+
+def _cached_exists(path: str) -> bool:
+    """os.path.exists, remembered per path for the cache TTL"""
+    exists = _EXISTS_CACHE.get(path)
+    if exists is None:
+        exists = os.path.exists(path)
+        _EXISTS_CACHE.set(path, exists)
+    return exists
+
 
 class LoanServiceFactory:
     """Factory class to create appropriate loan service instances"""
     
-    _services: Dict[str, BaseLoanService] = {}
+    # Live services keyed by (loan_type, API key digest), so each key gets its own client.
+    # An entry disappears once nothing uses the service; _recent keeps the latest ones alive.
+    _services: "weakref.WeakValueDictionary[Tuple[str, str], BaseLoanService]" = weakref.WeakValueDictionary()
+    _recent: "OrderedDict[Tuple[str, str], BaseLoanService]" = OrderedDict()
+    MAX_RECENT_SERVICES = 16
+    # Guards _recent and _type_locks; each key's lock serializes only that service's construction
+    _lock = threading.Lock()
+    _type_locks: Dict[Tuple[str, str], threading.Lock] = {}
     
     # Define service mappings
     SERVICE_CLASSES: Dict[str, Type[BaseLoanService]] = {
@@ -36,31 +65,77 @@ class LoanServiceFactory:
     def get_service(cls, loan_type: str, openai_api_key: Optional[str] = None) -> BaseLoanService:
         """Get loan service instance for the specified loan type"""
         
-        # Normalize loan type
-        loan_type = loan_type.lower().strip()
+        loan_type = cls._normalize_loan_type(loan_type)
         
+        # Use cached instance if available
+        key = (loan_type, cls._api_key_digest(openai_api_key))
+        service = cls._services.get(key)
+        if service is None:
+            with cls._lock:
+                type_lock = cls._type_locks.setdefault(key, threading.Lock())
+            with type_lock:
+                # Another thread may have built it while we waited
+                service = cls._services.get(key)
+                if service is None:
+                    service = cls._services[key] = cls._create_service(loan_type, openai_api_key)
+        
+        with cls._lock:
+            cls._recent[key] = service
+            cls._recent.move_to_end(key)
+            while len(cls._recent) > cls.MAX_RECENT_SERVICES:
+                evicted, _ = cls._recent.popitem(last=False)
+                cls._type_locks.pop(evicted, None)
+        return service
+    
+    @classmethod
+    def _normalize_loan_type(cls, loan_type: str) -> str:
+        """Lowercase and strip loan_type, rejecting unsupported types"""
+        loan_type = loan_type.lower().strip()
         if loan_type not in cls.SERVICE_CLASSES:
             raise ValueError(f"Unsupported loan type: {loan_type}. Available types: {list(cls.SERVICE_CLASSES.keys())}")
+        return loan_type
+    
+    @classmethod
+    def _resolve_model_path(cls, loan_type: str) -> str:
+        """Absolute model directory for loan_type, relative to the project root"""
+        # Resolve to absolute path relative to project root (one level up from this file's directory)
+        relative_model_path = cls.MODEL_PATHS[loan_type]
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        return os.path.join(base_dir, relative_model_path) if not os.path.isabs(relative_model_path) else relative_model_path
+    
+    @staticmethod
+    def _api_key_digest(openai_api_key: Optional[str]) -> str:
+        """Short digest of the API key, so cache keys never hold the key itself"""
+        return hashlib.blake2b((openai_api_key or '').encode(), digest_size=8).hexdigest()
+    
+    @classmethod
+    def prewarm(cls, loan_types: Optional[Iterable[str]] = None, openai_api_key: Optional[str] = None,
+                max_workers: int = 4) -> List[str]:
+        """Build and cache services up front (all types by default) so no request pays the model load.
+        Types load concurrently, each artifact under its own lock; returns the types that loaded."""
+        types = list(loan_types) if loan_types else list(cls.SERVICE_CLASSES)
         
-        # Use cached instance if available
-        if loan_type not in cls._services:
-            cls._services[loan_type] = cls._create_service(loan_type, openai_api_key)
+        def load(loan_type: str) -> Optional[str]:
+            try:
+                cls.get_service(loan_type, openai_api_key)
+                return loan_type
+            except Exception as e:
+                logger.warning("Could not prewarm %s loan service: %s", loan_type, e)
+                return None
         
-        return cls._services[loan_type]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [loan_type for loan_type in executor.map(load, types) if loan_type]
     
     @classmethod
     def _create_service(cls, loan_type: str, openai_api_key: Optional[str] = None) -> BaseLoanService:
         """Create a new loan service instance"""
         
         service_class = cls.SERVICE_CLASSES[loan_type]
-        # Resolve to absolute path relative to project root (one level up from this file's directory)
-        relative_model_path = cls.MODEL_PATHS[loan_type]
-        base_dir = os.path.dirname(os.path.dirname(__file__))
-        model_path = os.path.join(base_dir, relative_model_path) if not os.path.isabs(relative_model_path) else relative_model_path
+        model_path = cls._resolve_model_path(loan_type)
         
         # Check if model directory exists
-        if not os.path.exists(model_path):
-            print(f"WARNING: Model path '{model_path}' does not exist. Service will be created but models may not load.")
+        if not _cached_exists(model_path):
+            logger.warning("Model path '%s' does not exist. Service will be created but models may not load.", model_path)
         
         try:
             return service_class(model_path, openai_api_key)
@@ -87,20 +162,35 @@ class LoanServiceFactory:
             "loan_type": loan_type,
             "service_class": service_class.__name__,
             "model_path": model_path,
-            "model_exists": os.path.exists(model_path)
+            "model_exists": _cached_exists(model_path)
         }
     
     @classmethod
     def clear_cache(cls, loan_type: Optional[str] = None):
         """Clear cached service instances - specific type or all"""
-        if loan_type:
-            if loan_type in cls._services:
-                del cls._services[loan_type]
-        else:
-            cls._services.clear()
+        with cls._lock:
+            if loan_type:
+                loan_type = loan_type.lower().strip()
+                for key in [key for key in cls._recent if key[0] == loan_type]:
+                    del cls._recent[key]
+                for key in [key for key in cls._services.keys() if key[0] == loan_type]:
+                    cls._services.pop(key, None)
+                for key in [key for key in cls._type_locks if key[0] == loan_type]:
+                    del cls._type_locks[key]
+            else:
+                cls._recent.clear()
+                cls._services.clear()
+                cls._type_locks.clear()
     
     @classmethod
     def reload_service(cls, loan_type: str, openai_api_key: Optional[str] = None) -> BaseLoanService:
         """Force reload of a specific service"""
+        loan_type = cls._normalize_loan_type(loan_type)
+        model_path = cls._resolve_model_path(loan_type)
         cls.clear_cache(loan_type)
+        # Only this type's artifacts are re-read; other services keep their loaded models
+        BaseLoanService.clear_model_cache(model_path)
+        _EXISTS_CACHE.pop(model_path)
+        _EXISTS_CACHE.pop(cls.MODEL_PATHS[loan_type])  # get_service_info checks the configured path
+        cls.SERVICE_CLASSES[loan_type].clear_prediction_cache()
         return cls.get_service(loan_type, openai_api_key)
\ No newline at end of file
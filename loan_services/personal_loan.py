@@ -1,38 +1,108 @@
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, List, Any, Optional, Tuple
+from functools import lru_cache
 import numpy as np
 import joblib
 import re
-import json
-from .base_loan import BaseLoanService
+import orjson
+import logging
+from .base_loan import BaseLoanService, _TTLCache
 
-class PersonalLoanService(BaseLoanService):
-    """Personal Loan Service with ML Model Integration"""
-    
-    def get_required_fields(self) -> List[str]:
-        return [
-            # Customer Contact Information
-            "Customer_Name",
-            "Customer_Email", 
-            "Customer_Phone",
-            # Model Prediction Fields
-            "Age",
-            "Employment_Type",
-            "Employment_Duration_Years",
-            "Annual_Income",
-            "CIBIL_Score",
-            "Existing_EMIs",
-            "Loan_Term_Years",
-            "Expected_Loan_Amount",  # Added for frontend compatibility
-        ]
-    
-    def get_model_files(self) -> Dict[str, str]:
-        return {
-            "personal_loan_model": "personal_loan_model.pkl",
-        }
-    
-    def get_system_prompt(self) -> str:
-        return """You are a friendly and professional personal loan advisor chatbot.
+logger = logging.getLogger(__name__)
+
+# Precompiled patterns for the extraction and validation hot path
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+_NAME_PATTERNS = [
+    re.compile(r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})", re.IGNORECASE),
+    re.compile(r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$", re.IGNORECASE),
+]
+_ALPHA_WORD_RE = re.compile(r'^[a-zA-Z]+$')
+_PHONE_PATTERNS = [
+    re.compile(r'(?:\+?91[\s-]?)?([6-9]\d{9})'),
+    re.compile(r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})'),
+]
+_NON_DIGIT_RE = re.compile(r'[^\d]')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_AGE_PATTERNS = [
+    re.compile(r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})'),
+    re.compile(r'(\d{1,2})\s*(?:years?\s*old|yrs?)'),
+    re.compile(r'i am\s*(\d{1,2})'),
+]
+# The age patterns with an explicit age cue ("age 25", "25 years old"); only these make an Age trustworthy
+_EXPLICIT_AGE_PATTERNS = _AGE_PATTERNS[:2]
+_BARE_AGE_RE = re.compile(r'\b(\d{1,2})\b')
+# Group names map to fields through _AMOUNT_FIELDS; each field keeps its own minimum
+_AMOUNT_CUE_BEFORE_RE = re.compile(
+    r'(?:(?P<income>annual[^\d]{0,30}?income|yearly[^\d]{0,30}?salary|earn[^\d]{0,30}?yearly)'
+    r'|(?P<emi>(?:existing|current)[^\d]{0,30}?emi|monthly[^\d]{0,30}?payment)'
+    r'|(?P<loan>loan[^\d]{0,10}?amount|(?:need|want)[^\d]{0,30}?loan))'
+    r'[^\d]{0,40}?(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?'
+)
+_AMOUNT_CUE_AFTER_RE = re.compile(
+    r'(?P<num>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>lakhs?|crores?)?[^\d]{0,40}?'
+    r'(?:(?P<income>annual[^\d]{0,30}?income|yearly[^\d]{0,30}?salary)'
+    r'|(?P<emi>emi[^\d]{0,10}?payment)'
+    r'|(?P<loan>loan[^\d]{0,10}?amount|need[^\d]{0,30}?loan))'
+)
+_AMOUNT_FIELDS = (
+    ('income', 'Annual_Income', 200000),  # minimum reasonable income
+    ('emi', 'Existing_EMIs', 0),
+    ('loan', 'Expected_Loan_Amount', 50000),  # minimum loan amount
+)
+_CIBIL_PATTERNS = [
+    re.compile(r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})'),
+    re.compile(r'(\d{3})\s*(?:cibil|credit.*?score)'),
+]
+_DURATION_PATTERNS = [
+    re.compile(r'(?:working|employed|experience).*?(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*(?:years?|yrs?).*?(?:working|employed|experience)'),
+]
+_TERM_PATTERNS = [
+    re.compile(r'(?:term|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)'),
+    re.compile(r'(\d+)\s*(?:years?|yrs?).*?(?:term|duration)'),
+]
+# Cue word -> field pattern families that need it. A keyword that starts with a shorter one
+# ('yearly' / 'year') carries both families, as the lookahead reports only the longest per position
+_FIELD_CUES = {
+    'annual': ('amount',), 'yearly': ('amount', 'age', 'term'), 'year': ('age', 'term'), 'yr': ('age', 'term'),
+    'age': ('age',), 'i am': ('age', 'name'), 'cibil': ('cibil',), 'credit': ('cibil',),
+    'my name is': ('name',), "i'm": ('name',), 'call me': ('name',), 'name:': ('name',), 'this is': ('name',),
+    'working': ('duration',), 'employed': ('duration',), 'experience': ('duration',),
+    'emi': ('amount',), 'monthly': ('amount',), 'loan': ('amount',),
+}
+_FIELD_CUE_RE = re.compile('(?=(' + '|'.join(sorted(_FIELD_CUES, key=len, reverse=True)) + '))')
+# Words in the assistant's last question -> the field family it asks for
+_INTENT_KEYWORDS = {
+    'name': 'name', 'call you': 'name',
+    'email': 'email',
+    'phone': 'phone', 'mobile': 'phone', 'contact': 'phone', 'number': 'phone',
+    'age': 'age', 'how old': 'age', 'years old': 'age',
+    'cibil': 'cibil', 'credit score': 'cibil',
+    'employment type': 'employment', 'salaried': 'employment', 'self-employed': 'employment',
+    'how long': 'duration', 'experience': 'duration',
+    'income': 'amount', 'salary': 'amount', 'emi': 'amount', 'emis': 'amount', 'loan amount': 'amount', 'how much': 'amount',
+    'term': 'term', 'tenure': 'term', 'repay': 'term', 'repayment': 'term',
+}
+_INTENT_RE = re.compile(r'\b(' + '|'.join(re.escape(k) for k in sorted(_INTENT_KEYWORDS, key=len, reverse=True)) + r')\b')
+# Leading number in an amount string such as '₹5,00,000' or '1.5 lakh'
+_AMOUNT_NUMBER_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+_EMPLOYMENT_KEYWORDS = {
+    'self employed': 'Self-Employed', 'self-employed': 'Self-Employed', 'business': 'Self-Employed', 'entrepreneur': 'Self-Employed',
+    'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried', 'working': 'Salaried'
+}
+_EMPLOYMENT_RANK = {keyword: rank for rank, keyword in enumerate(_EMPLOYMENT_KEYWORDS)}
+# Zero-width lookahead so one scan reports every keyword, including overlapping ones
+_EMPLOYMENT_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(k) for k in sorted(_EMPLOYMENT_KEYWORDS, key=len, reverse=True)) + '))'
+)
+# Fields the patterns parse unambiguously; a valid one lets extraction skip OpenAI
+_CONFIDENT_FIELDS = ("Customer_Phone", "Customer_Email", "Age", "CIBIL_Score", "Employment_Type", "Loan_Term_Years")
+# Separators stripped from phone numbers before validation
+_PHONE_STRIP = str.maketrans('', '', ' -()+')
+_EMAIL_VALIDATE_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+
+# Constant prompt text, shared by every call rather than rebuilt per turn
+_SYSTEM_PROMPT = """You are a friendly and professional personal loan advisor chatbot.
 
 Your task is to systematically collect the following information from users through natural conversation:
 
@@ -62,19 +132,9 @@ Guidelines:
 8) Do NOT provide loan predictions - only collect information professionally.
 
 Start by introducing yourself as a personal loan specialist."""
-    
-    def get_fallback_greeting(self) -> str:
-        return "Hello! I'm a personal loan specialist here to help you with your loan application. Let's start with your full name - what should I call you?"
-    
-    def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
-        return f"""
-Based on the conversation history and the user's latest response, extract any personal loan-related information.
-
-Conversation so far: {conversation[-3:] if len(conversation) > 3 else conversation}
-
-User's latest response: "{user_text}"
-
-Extract information for these fields (only if clearly mentioned):
+_FALLBACK_GREETING = "Hello! I'm a personal loan specialist here to help you with your loan application. Let's start with your full name - what should I call you?"
+_EXTRACTION_PROMPT_HEAD = "Based on the conversation history and the user's latest response, extract any personal loan-related information."
+_EXTRACTION_PROMPT_TAIL = """Extract information for these fields (only if clearly mentioned):
 
 Customer Information:
 - Customer_Name: full name as string
@@ -97,15 +157,211 @@ Important:
 - For Employment_Duration_Years, ask about years in current employment type, not total experience
 - Extract only information that is clearly stated
 
-Return ONLY a JSON object with the extracted fields. If no information is found, return empty JSON {{}}.
-Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried", "Annual_Income": 1200000, "Employment_Duration_Years": 12}}
-""".strip()
+Return ONLY a JSON object with the extracted fields. If no information is found, return empty JSON {}.
+Example: {"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried", "Annual_Income": 1200000, "Employment_Duration_Years": 12}"""
+
+
+_EMPLOYMENT_TYPES = ("Self-Employed", "Salaried")
+
+_ERR_NAME_EMPTY = "Please provide your full name."
+_ERR_NAME_SHORT = "Please provide your complete name."
+_ERR_EMAIL = "Please provide a valid email address."
+_ERR_PHONE = "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
+_ERR_AGE_LOW = "INELIGIBLE: You must be at least 21 years old to apply for a personal loan. Unfortunately, we cannot process your application at this time."
+_ERR_AGE_HIGH = "INELIGIBLE: Personal loans are available only for applicants up to 65 years of age. Unfortunately, we cannot process your application at this time."
+_ERR_CIBIL_LOW = "INELIGIBLE: A minimum CIBIL score of 650 is required for personal loan approval. Your current score does not meet our eligibility criteria."
+_ERR_CIBIL_RANGE = "Please provide a valid CIBIL score between 300 and 900. Could you check and confirm your credit score?"
+_ERR_DURATION_NEGATIVE = "INELIGIBLE: Employment duration cannot be negative. Please provide valid employment experience."
+_ERR_DURATION_SHORT = "INELIGIBLE: You must have at least 1 year of employment experience to qualify for a personal loan."
+_ERR_DURATION_HIGH = "Employment duration seems unusually high. Could you please confirm how many years you've been in your current employment type?"
+_ERR_INCOME_POSITIVE = "Annual income must be a positive amount. Please provide your yearly income."
+_ERR_INCOME_LOW = "INELIGIBLE: Minimum annual income of ₹2,00,000 is required for personal loan eligibility."
+_ERR_INCOME_HIGH = "Please verify your annual income. The amount seems unusually high. Could you confirm?"
+_ERR_EMPLOYMENT = f"Please select your employment type from: {', '.join(_EMPLOYMENT_TYPES)}. Which category describes your employment?"
+_ERR_TERM = "Loan term must be between 1 and 7 years. Please specify your preferred repayment period."
+_ERR_LOAN_POSITIVE = "Loan amount must be a positive value. Please specify your loan requirement."
+_ERR_LOAN_LOW = "Minimum loan amount is ₹50,000. Please specify an amount of at least ₹50,000."
+_ERR_LOAN_HIGH = "Maximum loan amount is ₹20,00,000. Please specify an amount within this limit."
+_ERR_EMI = "EMI amount cannot be negative. Please provide your current monthly EMI obligations (enter 0 if none)."
+
+
+def _v_noop(value: Any) -> Tuple[bool, str]:
+    return True, ""
+
+def _v_name(value: Any) -> Tuple[bool, str]:
+    if not value or not str(value).strip():
+        return False, _ERR_NAME_EMPTY
+    if len(str(value).strip()) < 2:
+        return False, _ERR_NAME_SHORT
+    return True, ""
+
+def _v_email(value: Any) -> Tuple[bool, str]:
+    if not _EMAIL_VALIDATE_RE.match(str(value)):
+        return False, _ERR_EMAIL
+    return True, ""
+
+def _v_phone(value: Any) -> Tuple[bool, str]:
+    phone_str = str(value).translate(_PHONE_STRIP)
+    if len(phone_str) == 12 and phone_str.startswith('91'):
+        phone_str = phone_str[2:]
+    if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
+        return False, _ERR_PHONE
+    return True, ""
+
+def _v_age(value: Any) -> Tuple[bool, str]:
+    age = float(value)
+    if age < 21:
+        return False, _ERR_AGE_LOW
+    elif age > 65:
+        return False, _ERR_AGE_HIGH
+    return True, ""
+
+def _v_cibil(value: Any) -> Tuple[bool, str]:
+    cibil = float(value)
+    if cibil < 650:
+        return False, _ERR_CIBIL_LOW
+    elif not (300 <= cibil <= 900):
+        return False, _ERR_CIBIL_RANGE
+    return True, ""
+
+def _v_duration(value: Any) -> Tuple[bool, str]:
+    duration = float(value)
+    if duration < 0:
+        return False, _ERR_DURATION_NEGATIVE
+    elif duration < 1:
+        return False, _ERR_DURATION_SHORT
+    elif duration > 45:
+        return False, _ERR_DURATION_HIGH
+    return True, ""
+
+def _v_income(value: Any) -> Tuple[bool, str]:
+    income = float(value)
+    if income <= 0:
+        return False, _ERR_INCOME_POSITIVE
+    elif income < 200000:  # Minimum 2 lakhs per year
+        return False, _ERR_INCOME_LOW
+    elif income > 50000000:  # Maximum 5 crores
+        return False, _ERR_INCOME_HIGH
+    return True, ""
+
+def _v_employment(value: Any) -> Tuple[bool, str]:
+    if value not in _EMPLOYMENT_TYPES:
+        return False, _ERR_EMPLOYMENT
+    return True, ""
+
+def _v_term(value: Any) -> Tuple[bool, str]:
+    if not (1 <= float(value) <= 7):
+        return False, _ERR_TERM
+    return True, ""
+
+def _v_loan_amount(value: Any) -> Tuple[bool, str]:
+    amount = float(value)
+    if amount <= 0:
+        return False, _ERR_LOAN_POSITIVE
+    elif amount < 50000:
+        return False, _ERR_LOAN_LOW
+    elif amount > 2000000:
+        return False, _ERR_LOAN_HIGH
+    return True, ""
+
+def _v_emi(value: Any) -> Tuple[bool, str]:
+    if float(value) < 0:
+        return False, _ERR_EMI
+    return True, ""
+
+_VALIDATORS = {
+    "Customer_Name": _v_name,
+    "Customer_Email": _v_email,
+    "Customer_Phone": _v_phone,
+    "Age": _v_age,
+    "CIBIL_Score": _v_cibil,
+    "Employment_Duration_Years": _v_duration,
+    "Annual_Income": _v_income,
+    "Employment_Type": _v_employment,
+    "Loan_Term_Years": _v_term,
+    "Expected_Loan_Amount": _v_loan_amount,
+    "Existing_EMIs": _v_emi,
+}
+
+
+@lru_cache(maxsize=256)
+def _amount_from_parts(number_str: str, unit: Optional[str]) -> float:
+    """Turn a captured number and optional lakh/crore unit into rupees (memoized: replies repeat amounts)"""
+    try:
+        number = float(number_str.replace(',', ''))
+    except ValueError:
+        return 0.0
+    if unit and unit.startswith('crore'):
+        return number * 10000000  # 1 crore = 1,00,00,000
+    elif unit and unit.startswith('lakh'):
+        return number * 100000    # 1 lakh = 1,00,000
+    return number
+
+
+class PersonalLoanService(BaseLoanService):
+    """Personal Loan Service with ML Model Integration"""
+    
+    # Components of the personal model package, unpacked once by load_models
+    _model = None
+    _scaler = None
+    _encoder = None
+    _features: Optional[List[str]] = None
+    # Encoder classes as a plain dict, so encoding a row is a lookup rather than a transform call
+    _employment_codes: Dict[str, int] = {}
+    # Final (loan amount, rate) per encoded feature row; retries and confirmations repeat
+    # the same inputs. Shared across instances, which share the loaded model
+    _prediction_cache = _TTLCache(maxsize=1024, ttl=86400)
+    
+    def get_required_fields(self) -> List[str]:
+        return [
+            # Customer Contact Information
+            "Customer_Name",
+            "Customer_Email", 
+            "Customer_Phone",
+            # Model Prediction Fields
+            "Age",
+            "Employment_Type",
+            "Employment_Duration_Years",
+            "Annual_Income",
+            "CIBIL_Score",
+            "Existing_EMIs",
+            "Loan_Term_Years",
+            "Expected_Loan_Amount",  # Added for frontend compatibility
+        ]
+    
+    def get_model_files(self) -> Dict[str, str]:
+        return {
+            "personal_loan_model": "personal_loan_model.pkl",
+        }
+    
+    def get_system_prompt(self) -> str:
+        return _SYSTEM_PROMPT
+    
+    def get_fallback_greeting(self) -> str:
+        return _FALLBACK_GREETING
+    
+    def get_extraction_prompt(self, user_text: str, conversation: List[Dict[str, str]]) -> str:
+        conv_snippet = conversation[-3:] if len(conversation) > 3 else conversation
+        return f"{_EXTRACTION_PROMPT_HEAD}\n\nConversation so far: {conv_snippet}\n\nUser's latest response: \"{user_text}\"\n\n{_EXTRACTION_PROMPT_TAIL}"
     
-    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def extract_info_from_response(self, user_text: str, conversation: List[Dict[str, str]], current_field: Optional[str] = None,
+                                    last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Extract information from user response with enhanced fallback logic"""
-        print(f"DEBUG - Starting extraction for: '{user_text}'")
-        
-        # Try OpenAI first if available
+        logger.debug("Starting extraction for: '%s'", user_text)
+        # The app passes the tracked question; only scan the history when called without it
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
+        
+        # Cheap pattern pass first: a valid phone, email, age, CIBIL score, employment type or
+        # loan term that answers the question being asked needs no OpenAI round trip
+        quick = self._enhanced_fallback_extraction(user_text, conversation, last_assistant_msg)
+        # An Age read from a bare number ("loan amount 25 lakhs") is only a guess; it must be explicit to skip OpenAI
+        age_explicit = 'Age' not in quick or any(p.search(user_text.lower()) for p in _EXPLICIT_AGE_PATTERNS)
+        if age_explicit and self._is_confident(quick, current_field):
+            logger.debug("Prefilter extracted: %s", quick)
+            return quick
+        
+        # Try OpenAI if available
         if self.client:
             extraction_prompt = self.get_extraction_prompt(user_text, conversation)
             
@@ -116,96 +372,116 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
                     temperature=0
                 )
                 extracted_text = resp.choices[0].message.content.strip()
-                m = re.search(r"\{.*\}", extracted_text, re.DOTALL)
+                m = _JSON_OBJECT_RE.search(extracted_text)
                 if m:
-                    extracted = json.loads(m.group())
-                    print(f"DEBUG - OpenAI extracted: {extracted}")
+                    extracted = orjson.loads(m.group())
+                    logger.debug("OpenAI extracted: %s", extracted)
                     if extracted:  # Only return if we got something useful
                         return extracted
             except Exception as e:
-                print(f"DEBUG - OpenAI extraction failed: {e}")
+                logger.debug("OpenAI extraction failed: %s", e)
         
         # Enhanced fallback extraction
-        return self._enhanced_fallback_extraction(user_text, conversation)
+        return quick
+    
+    def _is_confident(self, extracted: Dict[str, Any], current_field: Optional[str]) -> bool:
+        """True when extracted covers the asked-for field and holds at least one valid high-confidence field"""
+        if current_field and current_field not in extracted:
+            return False
+        # The bare-word name pattern also fires on replies like "salaried"; an unrequested name is ambiguous
+        if 'Customer_Name' in extracted and current_field != 'Customer_Name':
+            return False
+        return any(
+            field in extracted and self.validate_field(field, extracted[field])[0]
+            for field in _CONFIDENT_FIELDS
+        )
     
-    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _get_last_assistant_msg(self, conversation: List[Dict[str, str]]) -> str:
+        """Return the most recent assistant message, lowercased"""
+        for msg in reversed(conversation):
+            if msg.get('role') == 'assistant':
+                return msg.get('content', '').lower()
+        return ""
+    
+    def _enhanced_fallback_extraction(self, user_text: str, conversation: List[Dict[str, str]],
+                                      last_assistant_msg: Optional[str] = None) -> Dict[str, Any]:
         """Enhanced fallback extraction with context awareness"""
         extracted = {}
         text_lower = user_text.lower().strip()
         
         # Get context from last assistant message
-        last_assistant_msg = ""
-        if len(conversation) > 0:
-            for msg in reversed(conversation):
-                if msg.get('role') == 'assistant':
-                    last_assistant_msg = msg.get('content', '').lower()
-                    break
+        if last_assistant_msg is None:
+            last_assistant_msg = self._get_last_assistant_msg(conversation)
+        
+        # One scan for the cue words the field patterns below cannot match without;
+        # only the families whose cues appear get their patterns run
+        cues = {family for m in _FIELD_CUE_RE.finditer(text_lower) for family in _FIELD_CUES[m.group(1)]}
+        digits_only = _NON_DIGIT_RE.sub('', user_text)
+        employment_hits = {m.group(1) for m in _EMPLOYMENT_RE.finditer(text_lower)}
+        
+        # Field the last question asks for. When it asks for exactly one and the reply signals
+        # nothing else, the reply is taken as a bare answer and unrelated patterns are skipped
+        intents = {_INTENT_KEYWORDS[m.group(1)] for m in _INTENT_RE.finditer(last_assistant_msg)}
+        signalled = set(cues)
+        if '@' in user_text:
+            signalled.add('email')
+        if len(digits_only) >= 10:
+            signalled.add('phone')
+        if employment_hits:
+            signalled.add('employment')
+        bare_answer = len(intents) == 1 and signalled <= intents
         
         # 1. CUSTOMER NAME
-        name_patterns = [
-            r"(?:my name is|i am|i'm|call me|name:|this is)\s+([a-zA-Z\s]{2,30})",
-            r"^([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*)\s*$",
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, user_text, re.IGNORECASE)
-            if match:
-                name = match.group(1).strip().title()
-                if not any(word in name.lower() for word in ['years', 'old', 'work', 'job', 'score']):
-                    extracted['Customer_Name'] = name
-                    break
+        if not bare_answer or 'name' in intents:
+            for pattern in _NAME_PATTERNS:
+                match = pattern.search(user_text)
+                if match:
+                    name = match.group(1).strip().title()
+                    if not any(word in name.lower() for word in ['years', 'old', 'work', 'job', 'score']):
+                        extracted['Customer_Name'] = name
+                        break
         
         # Context-aware name extraction
-        if not extracted.get('Customer_Name') and ('name' in last_assistant_msg or 'call you' in last_assistant_msg):
+        if not extracted.get('Customer_Name') and 'name' in intents:
             words = user_text.strip().split()
-            if 1 <= len(words) <= 3 and all(re.match(r'^[a-zA-Z]+$', word) for word in words):
+            if 1 <= len(words) <= 3 and all(_ALPHA_WORD_RE.match(word) for word in words):
                 if not any(word.lower() in ['yes', 'no', 'ok', 'sure', 'hello', 'hi'] for word in words):
                     extracted['Customer_Name'] = user_text.strip().title()
         
-        # 2. PHONE NUMBER
-        phone_patterns = [
-            r'(?:\+?91[\s-]?)?([6-9]\d{9})',
-            r'(?:phone|mobile|contact|number)[\s:]*(\+?91)?[\s-]*([6-9]\d{9})',
-        ]
-        
-        for pattern in phone_patterns:
-            match = re.search(pattern, user_text)
-            if match:
-                phone = match.group(-1)
-                if len(phone) == 10 and phone[0] in '6789':
-                    extracted['Customer_Phone'] = phone
-                    break
-        
-        # Context-aware phone extraction
-        if not extracted.get('Customer_Phone') and any(word in last_assistant_msg for word in ['phone', 'mobile', 'contact', 'number']):
-            phone_digits = re.sub(r'[^\d]', '', user_text)
-            if len(phone_digits) == 10 and phone_digits[0] in '6789':
-                extracted['Customer_Phone'] = phone_digits
+        # 2. PHONE NUMBER - every phone pattern needs ten digits
+        if 'phone' in signalled:
+            for pattern in _PHONE_PATTERNS:
+                match = pattern.search(user_text)
+                if match:
+                    phone = match.group(match.lastindex)  # number is the last group in both patterns
+                    if len(phone) == 10 and phone[0] in '6789':
+                        extracted['Customer_Phone'] = phone
+                        break
+            
+            # Context-aware phone extraction
+            if not extracted.get('Customer_Phone') and 'phone' in intents:
+                if len(digits_only) == 10 and digits_only[0] in '6789':
+                    extracted['Customer_Phone'] = digits_only
         
         # 3. EMAIL
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        email_match = re.search(email_pattern, user_text)
-        if email_match:
-            extracted['Customer_Email'] = email_match.group(0)
+        if 'email' in signalled:
+            email_match = _EMAIL_RE.search(user_text)
+            if email_match:
+                extracted['Customer_Email'] = email_match.group(0)
         
         # 4. AGE
-        age_patterns = [
-            r'(?:age|years?\s*old|yrs?)\s*(?:is\s*)?(?::|=)?\s*(\d{1,2})',
-            r'(\d{1,2})\s*(?:years?\s*old|yrs?)',
-            r'i am\s*(\d{1,2})'
-        ]
-        
-        for pattern in age_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                age = int(match.group(1))
-                if 21 <= age <= 65:  # Personal loan specific age range
-                    extracted['Age'] = age
-                    break
+        if 'age' in cues:
+            for pattern in _AGE_PATTERNS:
+                match = pattern.search(text_lower)
+                if match:
+                    age = int(match.group(1))
+                    if 21 <= age <= 65:  # Personal loan specific age range
+                        extracted['Age'] = age
+                        break
         
         # Context-aware age extraction
-        if not extracted.get('Age') and 'age' in last_assistant_msg:
-            age_match = re.search(r'\b(\d{1,2})\b', user_text)
+        if not extracted.get('Age') and 'age' in intents:
+            age_match = _BARE_AGE_RE.search(user_text)
             if age_match:
                 age = int(age_match.group(1))
                 if 21 <= age <= 65:
@@ -213,102 +489,57 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
         
         # 5. PERSONAL LOAN SPECIFIC FIELDS
         
-        # Annual Income extraction
-        income_patterns = [
-            r'(?:annual.*?income|yearly.*?salary|earn.*?yearly).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:annual.*?income|yearly.*?salary)',
-        ]
-        
-        for pattern in income_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 200000:  # Minimum reasonable income
-                    extracted['Annual_Income'] = amount
-                    break
-        
         # CIBIL Score extraction
-        cibil_patterns = [
-            r'(?:cibil|credit.*?score)\s*(?:is\s*)?(?::|=)?\s*(\d{3})',
-            r'(\d{3})\s*(?:cibil|credit.*?score)',
-        ]
-        
-        for pattern in cibil_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                score = int(match.group(1))
-                if 300 <= score <= 900:
-                    extracted['CIBIL_Score'] = score
-                    break
-        
-        # Employment Type extraction
-        employment_mapping = {
-            'self employed': 'Self-Employed', 'self-employed': 'Self-Employed', 'business': 'Self-Employed', 'entrepreneur': 'Self-Employed',
-            'salaried': 'Salaried', 'employee': 'Salaried', 'job': 'Salaried', 'working': 'Salaried'
-        }
-        
-        for keyword, employment in employment_mapping.items():
-            if keyword in text_lower:
-                extracted['Employment_Type'] = employment
-                break
+        if 'cibil' in cues:
+            for pattern in _CIBIL_PATTERNS:
+                match = pattern.search(text_lower)
+                if match:
+                    score = int(match.group(1))
+                    if 300 <= score <= 900:
+                        extracted['CIBIL_Score'] = score
+                        break
+        
+        # Employment Type extraction - the earliest-ranked keyword present wins
+        if employment_hits:
+            extracted['Employment_Type'] = _EMPLOYMENT_KEYWORDS[min(employment_hits, key=_EMPLOYMENT_RANK.__getitem__)]
+        
+        # Replies without any digit ("salaried", a name) have nothing left for the numeric patterns
+        if not digits_only:
+            logger.debug("Fallback extracted: %s", extracted)
+            return extracted
         
         # Employment Duration extraction
-        duration_patterns = [
-            r'(?:working|employed|experience).*?(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?).*?(?:working|employed|experience)',
-        ]
-        
-        for pattern in duration_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                duration = int(match.group(1))
-                if 1 <= duration <= 45:  # Reasonable employment duration
-                    extracted['Employment_Duration_Years'] = duration
-                    break
-        
-        # Existing EMIs extraction
-        emi_patterns = [
-            r'(?:existing.*?emi|current.*?emi|monthly.*?payment).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:emi.*?payment)',
-        ]
-        
-        for pattern in emi_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 0:
-                    extracted['Existing_EMIs'] = amount
-                    break
+        if 'duration' in cues:
+            for pattern in _DURATION_PATTERNS:
+                match = pattern.search(text_lower)
+                if match:
+                    duration = int(match.group(1))
+                    if 1 <= duration <= 45:  # Reasonable employment duration
+                        extracted['Employment_Duration_Years'] = duration
+                        break
         
         # Loan Term extraction
-        term_patterns = [
-            r'(?:term|duration|years?)\s*(?:is\s*)?(?::|=)?\s*(\d+)\s*(?:years?|yrs?)',
-            r'(\d+)\s*(?:years?|yrs?).*?(?:term|duration)',
-        ]
-        
-        for pattern in term_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                term = int(match.group(1))
-                if 1 <= term <= 7:  # Personal loan specific term range
-                    extracted['Loan_Term_Years'] = term
-                    break
-        
-        # Expected Loan Amount extraction
-        loan_amount_patterns = [
-            r'(?:loan.*?amount|need.*?loan|want.*?loan).*?([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?)',
-            r'([\d,]+(?:\.[\d,]+)?\s*(?:lakh|lakhs|crore|crores)?).*?(?:loan.*?amount|need.*?loan)',
-        ]
-        
-        for pattern in loan_amount_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                amount = self.convert_amount_to_number(match.group(1))
-                if amount and amount >= 50000:  # Minimum loan amount
-                    extracted['Expected_Loan_Amount'] = amount
-                    break
-        
-        print(f"DEBUG - Fallback extracted: {extracted}")
+        if 'term' in cues:
+            for pattern in _TERM_PATTERNS:
+                match = pattern.search(text_lower)
+                if match:
+                    term = int(match.group(1))
+                    if 1 <= term <= 7:  # Personal loan specific term range
+                        extracted['Loan_Term_Years'] = term
+                        break
+        
+        # Income, existing EMI and loan amount in one pass per cue direction; the first
+        # amount that clears a field's minimum wins
+        if 'amount' in cues:
+            for pattern in (_AMOUNT_CUE_BEFORE_RE, _AMOUNT_CUE_AFTER_RE):
+                for match in pattern.finditer(text_lower):
+                    field, minimum = next((f, low) for group, f, low in _AMOUNT_FIELDS if match.group(group))
+                    if field not in extracted:
+                        amount = _amount_from_parts(match.group('num'), match.group('unit'))
+                        if amount > 0 and amount >= minimum:
+                            extracted[field] = amount
+        
+        logger.debug("Fallback extracted: %s", extracted)
         return extracted
     
     def convert_amount_to_number(self, amount_str: str) -> float:
@@ -316,119 +547,19 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
         if isinstance(amount_str, (int, float)):
             return float(amount_str)
             
-        amount_str = str(amount_str).lower().strip()
-        
-        # Remove currency symbols and extra spaces
-        amount_str = re.sub(r'[₹rs\.\s]+', '', amount_str)
-        
-        # Extract number and unit
-        number_match = re.search(r'([\d,]+(?:\.[\d,]+)?)', amount_str)
+        # Currency marks and spacing need no stripping: the number pattern skips past them
+        amount_str = str(amount_str).lower()
+        number_match = _AMOUNT_NUMBER_RE.search(amount_str)
         if not number_match:
             return 0.0
         
-        # Remove commas and convert to float
-        number_str = number_match.group(1).replace(',', '')
-        try:
-            number = float(number_str)
-        except ValueError:
-            return 0.0
-        
-        if 'crore' in amount_str:
-            return number * 10000000  # 1 crore = 1,00,00,000
-        elif 'lakh' in amount_str:
-            return number * 100000    # 1 lakh = 1,00,000
-        else:
-            return number
+        unit = 'crore' if 'crore' in amount_str else 'lakh' if 'lakh' in amount_str else None
+        return _amount_from_parts(number_match.group(1), unit)
     
     def validate_field(self, field_name: str, value: Any) -> Tuple[bool, str]:
         """Validate individual field values with strict eligibility criteria"""
         try:
-            if field_name == "Customer_Name":
-                if not value or not str(value).strip():
-                    return False, "Please provide your full name."
-                name = str(value).strip()
-                if len(name) < 2:
-                    return False, "Please provide your complete name."
-                return True, ""
-                
-            elif field_name == "Customer_Email":
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, str(value)):
-                    return False, "Please provide a valid email address."
-                return True, ""
-                
-            elif field_name == "Customer_Phone":
-                phone_str = str(value).replace(' ', '').replace('-', '').replace('(', '').replace(')', '').replace('+91', '')
-                if not phone_str.isdigit() or len(phone_str) != 10 or phone_str[0] not in '6789':
-                    return False, "Please provide a valid 10-digit mobile number starting with 6, 7, 8, or 9."
-                return True, ""
-                
-            elif field_name == "Age":
-                age = float(value)
-                if age < 21:
-                    return False, "INELIGIBLE: You must be at least 21 years old to apply for a personal loan. Unfortunately, we cannot process your application at this time."
-                elif age > 65:
-                    return False, "INELIGIBLE: Personal loans are available only for applicants up to 65 years of age. Unfortunately, we cannot process your application at this time."
-                return True, ""
-                
-            elif field_name == "CIBIL_Score":
-                cibil = float(value)
-                if cibil < 650:
-                    return False, "INELIGIBLE: A minimum CIBIL score of 650 is required for personal loan approval. Your current score does not meet our eligibility criteria."
-                elif not (300 <= cibil <= 900):
-                    return False, "Please provide a valid CIBIL score between 300 and 900. Could you check and confirm your credit score?"
-                return True, ""
-                
-            elif field_name == "Employment_Duration_Years":
-                duration = float(value)
-                if duration < 0:
-                    return False, "INELIGIBLE: Employment duration cannot be negative. Please provide valid employment experience."
-                elif duration < 1:
-                    return False, "INELIGIBLE: You must have at least 1 year of employment experience to qualify for a personal loan."
-                elif duration > 45:
-                    return False, "Employment duration seems unusually high. Could you please confirm how many years you've been in your current employment type?"
-                return True, ""
-                
-            elif field_name == "Annual_Income":
-                income = float(value)
-                if income <= 0:
-                    return False, "Annual income must be a positive amount. Please provide your yearly income."
-                elif income < 200000:  # Minimum 2 lakhs per year
-                    return False, "INELIGIBLE: Minimum annual income of ₹2,00,000 is required for personal loan eligibility."
-                elif income > 50000000:  # Maximum 5 crores
-                    return False, "Please verify your annual income. The amount seems unusually high. Could you confirm?"
-                return True, ""
-                
-            elif field_name == "Employment_Type":
-                valid_types = ["Self-Employed", "Salaried"]
-                if value not in valid_types:
-                    return False, f"Please select your employment type from: {', '.join(valid_types)}. Which category describes your employment?"
-                return True, ""
-                
-            elif field_name == "Loan_Term_Years":
-                term = float(value)
-                if not (1 <= term <= 7):
-                    return False, "Loan term must be between 1 and 7 years. Please specify your preferred repayment period."
-                return True, ""
-                
-            elif field_name == "Expected_Loan_Amount":
-                amount = float(value)
-                if amount <= 0:
-                    return False, "Loan amount must be a positive value. Please specify your loan requirement."
-                elif amount < 50000:
-                    return False, "Minimum loan amount is ₹50,000. Please specify an amount of at least ₹50,000."
-                elif amount > 2000000:
-                    return False, "Maximum loan amount is ₹20,00,000. Please specify an amount within this limit."
-                return True, ""
-                
-            elif field_name == "Existing_EMIs":
-                amount = float(value)
-                if amount < 0:
-                    return False, "EMI amount cannot be negative. Please provide your current monthly EMI obligations (enter 0 if none)."
-                return True, ""
-                
-            return True, ""
-            
+            return _VALIDATORS.get(field_name, _v_noop)(value)
         except (ValueError, TypeError):
             field_display = field_name.replace('_', ' ').lower()
             return False, f"Please provide a valid {field_display} in the correct format."
@@ -439,15 +570,32 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
         total_debt = existing_emi + proposed_emi
         return (total_debt / monthly_income) * 100 if monthly_income > 0 else 0
 
-    def prepare_model_input(self, user_input: Dict[str, Any]) -> pd.DataFrame:
-        """Prepare input data for the personal loan model based on your exact model structure"""
+    def load_models(self):
+        """Load models, then unpack the personal model package so predictions skip the dict lookups"""
+        super().load_models()
+        package = self.models.get("personal_loan_model")
+        if package:
+            self._model = package["model"]
+            self._scaler = package["scaler"]
+            self._encoder = package["encoder"]  # Label encoder for Employment_Type
+            self._features = package["features"]  # Feature order
+            self._employment_codes = {label: code for code, label in enumerate(self._encoder.classes_.tolist())}
+    
+    @classmethod
+    def clear_prediction_cache(cls):
+        """Drop memoized predictions, e.g. after the model is reloaded"""
+        cls._prediction_cache.clear()
+    
+    def prepare_model_input(self, user_input: Dict[str, Any]) -> np.ndarray:
+        """Prepare a (1, n_features) row in the package's feature order, Employment_Type encoded, ready for the scaler"""
         try:
-            # Create input dataframe matching your model's expected features
             # Based on your code: Age, Employment_Type, Employment_Duration_Years, Annual_Income, CIBIL_Score, Existing_EMIs, Loan_Term_Years
-            
+            employment_type = user_input['Employment_Type']
+            if employment_type not in self._employment_codes:
+                raise ValueError(f"Unknown Employment_Type {employment_type!r}; expected one of {list(self._employment_codes)}")
             input_data = {
                 'Age': float(user_input['Age']),
-                'Employment_Type': user_input['Employment_Type'],  # Will be encoded later
+                'Employment_Type': self._employment_codes[employment_type],
                 'Employment_Duration_Years': float(user_input['Employment_Duration_Years']),
                 'Annual_Income': float(user_input['Annual_Income']),
                 'CIBIL_Score': float(user_input['CIBIL_Score']),
@@ -455,62 +603,40 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
                 'Loan_Term_Years': float(user_input['Loan_Term_Years'])
             }
             
-            print(f"Personal Loan Input data prepared: {input_data}")
+            logger.debug("Personal Loan Input data prepared: %s", input_data)
             
-            input_df = pd.DataFrame([input_data])
-            
-            print(f"Prepared input dataframe shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
-            
-            return input_df
+            row = np.empty((1, len(self._features)), dtype=np.float64)
+            for idx, feature in enumerate(self._features):
+                row[0, idx] = input_data[feature]
+            return row
             
         except Exception as e:
-            print(f"Error in prepare_model_input: {e}")
+            logger.exception("Error in prepare_model_input")
             raise e
     
     def predict_loan(self, user_input: Dict[str, Any]) -> tuple:
         """Predict personal loan amount and interest rate using ML model"""
         try:
-            print(f"Personal Loan Prediction - Input: {user_input}")
-            
-            # Prepare input data
-            input_df = self.prepare_model_input(user_input)
-            print(f"Prepared input shape: {input_df.shape}")
-            print(f"Input columns: {list(input_df.columns)}")
+            logger.debug("Personal Loan Prediction - Input: %s", user_input)
             
             # Try to use actual ML model if available
-            if self.models.get("personal_loan_model"):
+            if self._model is not None:
                 try:
-                    print("Using ML model for prediction...")
-                    
-                    # Load the model package - matching your structure exactly
-                    package = self.models["personal_loan_model"]
-                    model = package["model"]
-                    scaler = package["scaler"]
-                    le = package["encoder"]  # Label encoder for Employment_Type
-                    features = package["features"]  # Feature order
+                    logger.debug("Using ML model for prediction, features: %s", self._features)
                     
-                    print("Model components loaded successfully")
-                    print(f"Expected features: {features}")
+                    # Encoded row already in feature order; scale it with your scaler
+                    row = self.prepare_model_input(user_input)
+                    cache_key = tuple(row[0].tolist())
+                    cached = self._prediction_cache.get(cache_key)
+                    if cached is not None:
+                        logger.debug("Cached ML Prediction - Loan: Rs.%.0f, Rate: %.2f%%", *cached)
+                        return cached
                     
-                    # Prepare data for prediction
-                    df_input = input_df.copy()
-                    
-                    # Encode Employment_Type using your label encoder
-                    df_input["Employment_Type"] = le.transform(df_input["Employment_Type"])
-                    print(f"After encoding Employment_Type: {df_input['Employment_Type'].values}")
-                    
-                    # Select features in the correct order
-                    df_input = df_input[features]
-                    print(f"After feature selection: {list(df_input.columns)}")
-                    
-                    # Scale features using your scaler
-                    df_scaled = scaler.transform(df_input)
-                    print(f"Scaled features shape: {df_scaled.shape}")
+                    df_scaled = self._scaler.transform(row)
                     
                     # Make predictions
-                    prediction = model.predict(df_scaled)[0]
-                    print(f"Raw predictions: {prediction}")
+                    prediction = self._model.predict(df_scaled)[0]
+                    logger.debug("Raw predictions: %s", prediction)
                     
                     # Handle predictions as per your structure
                     # prediction[0] = log-transformed loan amount
@@ -518,25 +644,21 @@ Example: {{"Customer_Name": "John Doe", "Age": 35, "Employment_Type": "Salaried"
                     loan_amount = np.expm1(prediction[0])  # inverse log transformation
                     interest_rate = float(prediction[1])
                     
-                    print(f"After transformation - Loan: Rs.{loan_amount:,.0f}, Rate: {interest_rate:.2f}%")
-                    
                     # Ensure reasonable bounds
                     loan_amount = max(50000, min(2000000, loan_amount))  # Between 50k and 20L
                     interest_rate = max(8.0, min(18.0, interest_rate))   # Between 8% and 18%
                     
-                    print(f"Final ML Prediction - Loan: Rs.{loan_amount:,.0f}, Rate: {interest_rate:.2f}%")
-                    return round(float(loan_amount), 0), round(float(interest_rate), 2)
+                    logger.debug("Final ML Prediction - Loan: Rs.%.0f, Rate: %.2f%%", loan_amount, interest_rate)
+                    result = round(float(loan_amount), 0), round(float(interest_rate), 2)
+                    self._prediction_cache.set(cache_key, result)
+                    return result
                     
                 except Exception as e:
-                    print(f"Model prediction error: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception("Model prediction error")
                     raise Exception(f"ML model prediction failed: {str(e)}")
             else:
                 raise Exception("Personal loan ML model not available. Cannot process loan prediction.")
             
         except Exception as e:
-            print(f"Prediction error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("Prediction error: %s", e)
             raise Exception(f"Personal loan prediction failed: {str(e)}")
\ No newline at end of file